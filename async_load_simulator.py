@@ -1,47 +1,539 @@
+import argparse
 import asyncio
+import logging
+import logging.handlers
+import multiprocessing
+import queue
+import random
+import time
+from collections import deque
+
+from scpi_capture import BINARY, FAILED, NO_RESPONSE, CaptureReader
+from scpi_commands import is_query, split_commands
+from scpi_parser import (DATA_STALE, ILLEGAL_PARAMETER, TRIGGER_IGNORED, CommandTree, SCPIError, bool_arg,
+                         choice_arg, number_arg, numbers_arg)
+
+logger = logging.getLogger("async_load_simulator")
+
+
+LOAD_COMMANDS = CommandTree([
+    ("*IDN", None, "identify"),
+    ("*RST", "reset_command", None),
+    ("*CLS", "clear_status", None),
+    ("*OPC", "operation_complete", "operation_complete_query"),
+    ("*TRG", "trigger_command", None),
+    ("SET:VALue", "set_value", None),
+    ("SYSTem:REMote", "system_remote", None),
+    ("SYSTem:LOCal", "system_local", None),
+    ("SYSTem:VERSion", None, "system_version"),
+    ("SYSTem:ERRor[:NEXT]", None, "system_error"),
+    ("OUTPut#[:STATe]", "set_output", "get_output"),
+    ("CHANnel", "set_channel", "get_channel"),
+    ("[SOURce]:FUNCtion", "set_function", "get_function"),
+    ("[SOURce]:INPut[:STATe]", "set_output", "get_output"),
+    ("[SOURce]:VOLTage[:LEVel][:IMMediate][:AMPLitude]", "set_voltage", "get_voltage"),
+    ("[SOURce]:CURRent[:LEVel][:IMMediate][:AMPLitude]", "set_current", "get_current"),
+    ("[SOURce]:VOLTage:MODE", "set_voltage_mode", "get_voltage_mode"),
+    ("[SOURce]:CURRent:MODE", "set_current_mode", "get_current_mode"),
+    ("[SOURce]:LIST:VOLTage[:LEVel]", "set_list_voltage", "get_list_voltage"),
+    ("[SOURce]:LIST:CURRent[:LEVel]", "set_list_current", "get_list_current"),
+    ("[SOURce]:LIST:VOLTage:POINts", None, "get_list_voltage_points"),
+    ("[SOURce]:LIST:CURRent:POINts", None, "get_list_current_points"),
+    ("[SOURce]:LIST:DWELl", "set_list_dwell", "get_list_dwell"),
+    ("[SOURce]:RESistance[:LEVel][:IMMediate][:AMPLitude]", "set_resistance", "get_resistance"),
+    ("[SOURce]:POWer[:LEVel][:IMMediate][:AMPLitude]", None, "measure_power"),
+    ("MEASure[:SCALar]:VOLTage[:DC]", None, "get_voltage"),
+    ("MEASure[:SCALar]:CURRent[:DC]", None, "get_current"),
+    ("MEASure[:SCALar]:POWer[:DC]", None, "measure_power"),
+    ("STATus:CHANnel:ENABle", "set_status_enable", "get_status_enable"),
+    ("TRIGger[:SEQuence]:SOURce", "set_trigger_source", "get_trigger_source"),
+    ("INITiate[:IMMediate]", "initiate", None),
+    ("ABORt", "abort", None),
+    ("FETCh[:SCALar]:VOLTage[:DC]", None, "fetch_voltage"),
+    ("FETCh[:SCALar]:CURRent[:DC]", None, "fetch_current"),
+    ("FETCh[:SCALar]:POWer[:DC]", None, "fetch_power"),
+    ("FETCh:TIME", None, "fetch_time"),
+])
+
+FUNCTIONS = ("CURRent", "RESistance", "VOLTage", "POWer")
+TRIGGER_SOURCES = ("BUS", "IMMediate")
+MODES = ("FIXed", "LIST")
+MAX_LIST_POINTS = 100000
+MAX_ERRORS = 32
+UNKNOWN_COMMAND = "ERROR: Unknown command"
+
+
+class VirtualInstrument:
+    def __init__(self, port, serial=1234, delay=0.0, jitter=0.0, drop_rate=0.0, error_rate=0.0):
+        self.port = port
+        self.serial = serial
+        self.delay = delay
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.error_rate = error_rate
+        self.idn = f"Load Simulator, Model LS100, Serial {serial}, Firmware 1.0"
+        self.errors = []
+        self.remote = False
+        self.reset()
+
+    def reset(self):
+        self.voltage = 14.0
+        self.current = 12.0
+        self.resistance = 5.0
+        self.output = False
+        self.channel = 1
+        self.function = "CURR"
+        self.status_enable = 0
+        self.trigger_source = "IMM"
+        self.armed = False
+        self.captured = None
+        self.modes = {"VOLT": "FIX", "CURR": "FIX"}
+        self.lists = {"VOLT": [], "CURR": []}
+        self.list_dwell = 0.01
+        self.list_started = None
+        self.errors.clear()
+
+    def push_error(self, entry):
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(entry)
+        else:
+            self.errors[-1] = '-350,"Queue overflow"'
+
+    def response_delay(self):
+        if not self.jitter:
+            return self.delay
+        return max(0.0, self.delay + random.uniform(-self.jitter, self.jitter))
+
+    def handle_line(self, line):
+        # Birleşik mesajdaki sorgu yanıtları tek satırda ';' ile birleştirilir
+        responses = []
+        for message in split_commands(line):
+            response = self.handle(message)
+            if response is not None:
+                responses.append(response)
+        return ";".join(responses) if responses else None
+
+    def handle(self, message):
+        # None: yanıt yok (ayar komutları, düşürülen sorgular)
+        query = is_query(message)
+        if query and self.drop_rate and random.random() < self.drop_rate:
+            return None
+        if self.error_rate and random.random() < self.error_rate:
+            self.push_error('-300,"Device-specific error"')
+            return "ERROR: Injected error" if query else None
+        if self.list_started is not None:
+            self.advance_list()
+        try:
+            return LOAD_COMMANDS.dispatch(self, message)
+        except SCPIError as e:
+            self.push_error(e.entry)
+            if not query:
+                return None
+            return UNKNOWN_COMMAND if e.code == -113 else f"ERROR: {e.message}"
+
+    # Komut işleyicileri: (parametreler, sayısal sonekler)
+    def identify(self, args, suffixes):
+        return self.idn
+
+    def reset_command(self, args, suffixes):
+        self.reset()
+
+    def clear_status(self, args, suffixes):
+        self.errors.clear()
+
+    def operation_complete(self, args, suffixes):
+        pass
+
+    def operation_complete_query(self, args, suffixes):
+        return "1"
+
+    def set_value(self, args, suffixes):
+        # Ayar komutudur; yanıt gönderilmez
+        pass
+
+    def system_remote(self, args, suffixes):
+        self.remote = True
+
+    def system_local(self, args, suffixes):
+        self.remote = False
+
+    def system_version(self, args, suffixes):
+        return "1999.0"
+
+    def system_error(self, args, suffixes):
+        return self.errors.pop(0) if self.errors else '0,"No error"'
+
+    def set_output(self, args, suffixes):
+        self.output = bool_arg(args)
+
+    def get_output(self, args, suffixes):
+        return "1" if self.output else "0"
+
+    def set_channel(self, args, suffixes):
+        self.channel = int(number_arg(args))
+
+    def get_channel(self, args, suffixes):
+        return str(self.channel)
+
+    def set_function(self, args, suffixes):
+        self.function = choice_arg(args, FUNCTIONS)
+
+    def get_function(self, args, suffixes):
+        return self.function
+
+    def set_voltage(self, args, suffixes):
+        self.voltage = number_arg(args)
+
+    def get_voltage(self, args, suffixes):
+        return f"{self.voltage:g}"
+
+    def set_current(self, args, suffixes):
+        self.current = number_arg(args)
+
+    def get_current(self, args, suffixes):
+        return f"{self.current:g}"
+
+    def set_resistance(self, args, suffixes):
+        self.resistance = number_arg(args)
+
+    def get_resistance(self, args, suffixes):
+        return f"{self.resistance:g}"
+
+    def measure_power(self, args, suffixes):
+        return f"{self.voltage * self.current:g}"
+
+    def set_status_enable(self, args, suffixes):
+        self.status_enable = int(number_arg(args))
+
+    def get_status_enable(self, args, suffixes):
+        return str(self.status_enable)
+
+    # Liste kipi: tetiklenince her dwell süresinde bir sonraki noktaya geçilir. Seviyeler
+    # zamanlayıcıyla değil, bir sonraki komut geldiğinde geçen süreden hesaplanır
+    def set_voltage_mode(self, args, suffixes):
+        self.modes["VOLT"] = choice_arg(args, MODES)
+
+    def get_voltage_mode(self, args, suffixes):
+        return self.modes["VOLT"]
+
+    def set_current_mode(self, args, suffixes):
+        self.modes["CURR"] = choice_arg(args, MODES)
+
+    def get_current_mode(self, args, suffixes):
+        return self.modes["CURR"]
+
+    def set_list(self, quantity, args):
+        points = numbers_arg(args)
+        if len(points) > MAX_LIST_POINTS:
+            raise SCPIError(*ILLEGAL_PARAMETER)
+        self.lists[quantity] = points
+
+    def set_list_voltage(self, args, suffixes):
+        self.set_list("VOLT", args)
+
+    def get_list_voltage(self, args, suffixes):
+        return ",".join(f"{value:g}" for value in self.lists["VOLT"])
+
+    def set_list_current(self, args, suffixes):
+        self.set_list("CURR", args)
+
+    def get_list_current(self, args, suffixes):
+        return ",".join(f"{value:g}" for value in self.lists["CURR"])
+
+    def get_list_voltage_points(self, args, suffixes):
+        return str(len(self.lists["VOLT"]))
+
+    def get_list_current_points(self, args, suffixes):
+        return str(len(self.lists["CURR"]))
+
+    def set_list_dwell(self, args, suffixes):
+        dwell = number_arg(args)
+        if dwell <= 0:
+            raise SCPIError(*ILLEGAL_PARAMETER)
+        self.list_dwell = dwell
+
+    def get_list_dwell(self, args, suffixes):
+        return f"{self.list_dwell:g}"
+
+    def start_list(self):
+        if any(self.modes[quantity] == "LIST" and self.lists[quantity] for quantity in self.lists):
+            self.list_started = time.monotonic()
+            self.advance_list()
+
+    def advance_list(self):
+        step = int((time.monotonic() - self.list_started) / self.list_dwell)
+        finished = True
+        for quantity, points in self.lists.items():
+            if self.modes[quantity] != "LIST" or not points:
+                continue
+            value = points[min(step, len(points) - 1)]
+            if quantity == "VOLT":
+                self.voltage = value
+            else:
+                self.current = value
+            finished = finished and step >= len(points) - 1
+        if finished:
+            self.list_started = None
+
+    # Tetiklemeli ölçüm: INIT kurar, *TRG (BUS) ya da INIT anında (IMM) değerler yakalanır,
+    # FETC? yakalanan değeri döndürür
+    def capture(self):
+        self.captured = {"VOLT": self.voltage, "CURR": self.current, "POW": self.voltage * self.current,
+                         "TIME": time.time()}
+        self.armed = False
+        self.start_list()
+
+    def set_trigger_source(self, args, suffixes):
+        self.trigger_source = choice_arg(args, TRIGGER_SOURCES)
+
+    def get_trigger_source(self, args, suffixes):
+        return self.trigger_source
+
+    def initiate(self, args, suffixes):
+        self.captured = None
+        if self.trigger_source == "IMM":
+            self.capture()
+        else:
+            self.armed = True
+
+    def trigger_command(self, args, suffixes):
+        if not self.armed or self.trigger_source != "BUS":
+            raise SCPIError(*TRIGGER_IGNORED)
+        self.capture()
+
+    def abort(self, args, suffixes):
+        self.armed = False
+        self.list_started = None
+
+    def fetch(self, quantity):
+        if self.captured is None:
+            raise SCPIError(*DATA_STALE)
+        return self.captured[quantity]
+
+    def fetch_voltage(self, args, suffixes):
+        return f"{self.fetch('VOLT'):g}"
+
+    def fetch_current(self, args, suffixes):
+        return f"{self.fetch('CURR'):g}"
+
+    def fetch_power(self, args, suffixes):
+        return f"{self.fetch('POW'):g}"
+
+    def fetch_time(self, args, suffixes):
+        return f"{self.fetch('TIME'):.6f}"
+
+
+def replay_key(command):
+    return command.strip().lstrip(":").upper()
+
+
+class ReplayInstrument:
+    # Kayıttaki yanıtlar komut başına kayıt sırasıyla döner (bitince başa sarar); gecikme,
+    # yanıtın cihazda geçirdiği süredir (ardışık yanıtlarda bir öncekinin gelişinden itibaren)
+    def __init__(self, port, exchanges):
+        self.port = port
+        self.responses = {}
+        self.delay = 0.0
+        previous = None
+        for exchange in exchanges:
+            if exchange.kind == NO_RESPONSE:
+                continue
+            start = exchange.sent if previous is None else max(exchange.sent, previous)
+            service = max(0, exchange.received - start) / 1e9
+            previous = exchange.received
+            response = bytes(exchange.response) if exchange.kind == BINARY else exchange.response
+            self.responses.setdefault(replay_key(exchange.command), deque()).append((service, exchange.kind, response))
+
+    def handle_line(self, line):
+        self.delay = 0.0
+        responses = []
+        for message in split_commands(line):
+            if is_query(message):
+                response = self.handle(message)
+                if response is not None:
+                    responses.append(response)
+        if not responses:
+            return None
+        if len(responses) == 1:
+            return responses[0]
+        return b";".join(r if isinstance(r, bytes) else r.encode() for r in responses)
+
+    def handle(self, message):
+        recorded = self.responses.get(replay_key(message))
+        if not recorded:
+            return UNKNOWN_COMMAND
+        service, kind, response = recorded[0]
+        recorded.rotate(-1)
+        self.delay += service
+        if kind == FAILED:
+            # Kayıtta zaman aşımına uğramış sorgu yanıtsız bırakılır
+            return None
+        if kind == BINARY:
+            length = str(len(response))
+            return f"#{len(length)}{length}".encode() + response
+        return response
+
+    def response_delay(self):
+        return self.delay
+
+
+def load_replay(path, port):
+    # Kayıttaki her bağlantı port'tan başlayarak ayrı bir porta yerleştirilir
+    exchanges = {}
+    names = {}
+    with CaptureReader(path) as reader:
+        for exchange in reader:
+            exchanges.setdefault(exchange.connection, []).append(exchange)
+            names[exchange.connection] = f"{exchange.name} ({exchange.host}:{exchange.port})"
+    if not exchanges:
+        raise ValueError(f"{path} contains no recorded exchanges.")
+    instruments = {}
+    for index, connection in enumerate(sorted(exchanges)):
+        recorded = sorted(exchanges[connection], key=lambda exchange: exchange.sent)
+        instruments[port + index] = ReplayInstrument(port + index, recorded)
+        logger.info("Replaying %s on port %s (%s exchanges)", names[connection], port + index, len(recorded))
+    return instruments
+
 
 class AsyncLoadSimulator:
-    def __init__(self, host='127.0.0.1', port=5025):
+    def __init__(self, host='127.0.0.1', port=5025, count=1, delay=0.0, jitter=0.0, drop_rate=0.0, error_rate=0.0,
+                 instruments=None):
         self.host = host
         self.port = port
-        self.commands = {
-            "*IDN?": "Load Simulator, Model LS100, Serial 1234, Firmware 1.0",
-            "SET:VALUE": "Load value set",
-            "CURR?": "12",
-            "VOLT?": "14",
-            "POW?": "28"
+        self.instruments = instruments or {
+            port + index: VirtualInstrument(port + index, 1234 + index, delay, jitter, drop_rate, error_rate)
+            for index in range(count)
         }
+        self.servers = []
 
     async def handle_client(self, reader, writer):
         addr = writer.get_extra_info('peername')
-        print(f"Connection from {addr}")
+        instrument = self.instruments.get(writer.get_extra_info('sockname')[1], self.instruments[self.port])
+        logger.info("Connection from %s to port %s", addr, instrument.port)
+        debug = logger.isEnabledFor(logging.DEBUG)
 
-        while True:
-            data = await reader.read(1024)
-            if not data:
-                break
-            message = data.decode().strip()
-            print(f"Received command: {message}")
+        buffer = bytearray()
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                buffer += data
+                end = buffer.rfind(b'\n')
+                if end < 0:
+                    continue
+                lines = buffer[:end].decode().split('\n')
+                del buffer[:end + 1]
 
-            response = self.commands.get(message, "ERROR: Unknown command")
-            writer.write((response + '\n').encode())
-            await writer.drain()
+                # Aynı segmentte gelen tüm komutlar işlenir, yanıtlar sırayla tek yazımda gönderilir
+                responses = []
+                delay = 0.0
+                for line in lines:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    if debug:
+                        logger.debug("Received command on %s: %s", instrument.port, line)
+                    response = instrument.handle_line(line)
+                    if response is not None:
+                        responses.append(response)
+                        delay += instrument.response_delay()
+                if not responses:
+                    continue
+                if delay:
+                    await asyncio.sleep(delay)
+                writer.write(b'\n'.join(r if isinstance(r, bytes) else r.encode() for r in responses) + b'\n')
+                await writer.drain()
+        except ConnectionResetError:
+            pass
 
-        print(f"Connection closed from {addr}")
+        logger.info("Connection closed from %s", addr)
         writer.close()
         await writer.wait_closed()
 
     async def start(self):
-        server = await asyncio.start_server(self.handle_client, self.host, self.port)
-        addr = server.sockets[0].getsockname()
-        print(f"Load Simulator started on {addr}")
+        for port in self.instruments:
+            server = await asyncio.start_server(self.handle_client, self.host, port)
+            self.servers.append(server)
+        logger.info("Load Simulator started on %s:%s-%s (%s instruments)",
+                    self.host, self.port, self.port + len(self.instruments) - 1, len(self.instruments))
+        await asyncio.gather(*(server.serve_forever() for server in self.servers))
 
-        async with server:
-            await server.serve_forever()
+    def stop(self):
+        for server in self.servers:
+            server.close()
+        self.servers.clear()
 
-if __name__ == "__main__":
-    simulator = AsyncLoadSimulator()
+
+def run_shard(host, port, count, options, log_queue, level):
+    # Alt süreç günlükleri kuyruk üzerinden ana süreçte yazılır
+    logging.basicConfig(level=level, handlers=[logging.handlers.QueueHandler(log_queue)], force=True)
+    simulator = AsyncLoadSimulator(host, port, count, **options)
     try:
         asyncio.run(simulator.start())
     except KeyboardInterrupt:
-        print("Load Simulator stopped")
+        pass
+
+
+def run_sharded(host, port, count, processes, options, level=logging.INFO):
+    log_queue = multiprocessing.Queue()
+    listener = logging.handlers.QueueListener(log_queue, *logging.getLogger().handlers)
+    listener.start()
+    shard_size = -(-count // processes)
+    workers = []
+    for start in range(0, count, shard_size):
+        worker = multiprocessing.Process(
+            target=run_shard,
+            args=(host, port + start, min(shard_size, count - start), options, log_queue, level),
+            daemon=True)
+        worker.start()
+        workers.append(worker)
+    try:
+        for worker in workers:
+            worker.join()
+    finally:
+        for worker in workers:
+            worker.terminate()
+        listener.stop()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Asyncio SCPI load simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5025, help="first port of the range")
+    parser.add_argument("--count", type=int, default=1, help="number of virtual instruments")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes to shard instruments across")
+    parser.add_argument("--delay", type=float, default=0.0, help="response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="uniform +/- jitter on the delay in seconds")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="probability of not answering a query")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of an injected error")
+    parser.add_argument("--verbose", action="store_true", help="log every received command")
+    parser.add_argument("--replay", help="serve the responses and latencies recorded in a capture file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    level = logging.DEBUG if args.verbose else logging.INFO
+    logging.basicConfig(level=level, format="%(asctime)s %(message)s")
+    options = {"delay": args.delay, "jitter": args.jitter, "drop_rate": args.drop_rate, "error_rate": args.error_rate}
+    if args.processes > 1 and not args.replay:
+        try:
+            run_sharded(args.host, args.port, args.count, args.processes, options, level)
+        except KeyboardInterrupt:
+            print("Load Simulator stopped")
+    else:
+        # Günlük yazımı ayrı bir iş parçacığında; olay döngüsü disk/konsol G/Ç'sini beklemez
+        log_queue = queue.SimpleQueue()
+        root = logging.getLogger()
+        listener = logging.handlers.QueueListener(log_queue, *root.handlers)
+        root.handlers = [logging.handlers.QueueHandler(log_queue)]
+        listener.start()
+        instruments = load_replay(args.replay, args.port) if args.replay else None
+        simulator = AsyncLoadSimulator(args.host, args.port, args.count, instruments=instruments, **options)
+        try:
+            asyncio.run(simulator.start())
+        except KeyboardInterrupt:
+            print("Load Simulator stopped")
+        finally:
+            listener.stop()
@@ -0,0 +1,220 @@
+import asyncio
+import socket
+import threading
+import time
+
+from scpi_client_base import NO_RESPONSE_EXPECTED, SCPIClientBase
+from scpi_commands import is_query, pipeline
+from scpi_framing import RECV_SIZE, FramingError, decode_frame
+
+
+def configure_socket(sock, keepalive_idle=10, keepalive_interval=5, keepalive_count=3):
+    if sock.family in (socket.AF_INET, socket.AF_INET6):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    # Platforma özgü keepalive ayarları her sistemde yok
+    for option, value in (("TCP_KEEPIDLE", keepalive_idle),
+                          ("TCP_KEEPINTVL", keepalive_interval),
+                          ("TCP_KEEPCNT", keepalive_count)):
+        if hasattr(socket, option):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
+
+class AsyncSCPIClient(SCPIClientBase):
+    def __init__(self, name, host, port):
+        super().__init__(name, host, port)
+        self.reader = None
+        self.writer = None
+        self.lock = None
+        self.last_activity = None
+
+    @property
+    def connected(self):
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def connect(self, timeout=5):
+        await self.open(timeout)
+        self.lock = asyncio.Lock()
+
+    async def open(self, timeout=5):
+        try:
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), timeout)
+        except Exception as e:
+            raise ConnectionError(f"Connection to {self.host}:{self.port} failed: {e or type(e).__name__}")
+        configure_socket(self.writer.get_extra_info('socket'))
+        self.reset_session()
+        self.last_activity = time.monotonic()
+
+    async def disconnect(self):
+        self.resync = False
+        if self.writer:
+            writer = self.writer
+            self.reader = None
+            self.writer = None
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    def drop(self):
+        # Çağıran self.lock'u tutar; bağlantı sıradaki komutta reopen ile yenilenir
+        if self.writer:
+            self.writer.close()
+            self.reader = None
+            self.writer = None
+        self.resync = True
+
+    async def reopen(self, timeout):
+        if self.connected:
+            return
+        if not self.resync:
+            raise self.not_connected()
+        await self.open(timeout)
+        self.metrics.reconnect()
+
+    async def send_command(self, command, expect_response=True, timeout=5):
+        if not self.connected and not self.resync:
+            raise self.not_connected()
+        response = self.cached(command, expect_response)
+        if response is not None:
+            return response
+        # Aynı bağlantı üzerinde komut/yanıt çiftleri karışmasın
+        async with self.lock:
+            await self.reopen(timeout)
+            started = time.perf_counter()
+            sent = time.time_ns()
+            pending = 0
+            try:
+                data = (command + '\n').encode('ascii')
+                self.writer.write(data)
+                self.metrics.sent(len(data))
+                await self.writer.drain()
+                if not expect_response:
+                    self.metrics.record(1)
+                    self.answered(command, sent, None)
+                    return NO_RESPONSE_EXPECTED
+                pending = 1
+                response = decode_frame(await asyncio.wait_for(self.read_frame(), timeout))
+                pending = 0
+                if not response:
+                    raise TimeoutError("No response from the device.")
+                self.metrics.record(1, time.perf_counter() - started)
+                self.answered(command, sent, response)
+                return response
+            except Exception as e:
+                raise self.failure(e, [command], sent, pending, "command")
+
+    def write_nowait(self, data):
+        # Çağıran self.lock'u tutmalıdır; grup tetiklemesinde yazımlar arasında await olmasın
+        if not self.connected:
+            raise self.not_connected()
+        self.writer.write(data)
+        self.metrics.sent(len(data))
+        self.metrics.record(1)
+        self.last_activity = time.monotonic()
+
+    async def send_batch(self, commands, timeout=5, join=True):
+        if not self.connected and not self.resync:
+            raise self.not_connected()
+        async with self.lock:
+            await self.reopen(timeout)
+            started = time.perf_counter()
+            sent = time.time_ns()
+            pending = 0
+            self.invalidate(commands)
+            responses = []
+            try:
+                data = pipeline(commands, join)
+                self.writer.write(data)
+                self.metrics.sent(len(data))
+                await self.writer.drain()
+                queries = [is_query(command) for command in commands]
+                pending = sum(queries)
+                for command, query in zip(commands, queries):
+                    response = None
+                    if query:
+                        response = decode_frame(await asyncio.wait_for(self.read_frame(), timeout))
+                        pending -= 1
+                    self.answered(command, sent, response)
+                    responses.append(NO_RESPONSE_EXPECTED if response is None else response)
+                self.metrics.record(len(commands), time.perf_counter() - started)
+                return responses
+            except Exception as e:
+                # Yanıtı gelmeyen sorgular send_command'daki gibi başarısız olarak yakalanır
+                unanswered = [command for command in commands[len(responses):] if is_query(command)]
+                raise self.failure(e, unanswered, sent, pending, "batch")
+
+    def receive(self, chunk):
+        self.buffer.feed(chunk)
+
+    async def read_frame(self):
+        while True:
+            try:
+                frame = self.buffer.next_frame()
+            except FramingError:
+                # Senkronizasyon kayboldu; bağlantı kapatılır, sıradaki komut yeniden bağlanır
+                self.drop()
+                raise
+            if frame is not None:
+                return frame
+            chunk = await self.reader.read(max(RECV_SIZE, self.buffer.pending()))
+            if not chunk:
+                raise ConnectionError(f"Connection to {self.host}:{self.port} closed by the device.")
+            self.receive(chunk)
+            self.metrics.received(len(chunk))
+            self.last_activity = time.monotonic()
+
+
+async def broadcast(clients, command, expect_response=True, timeout=5, callback=None, deadline=None,
+                    timeouts=None):
+    # timeouts: anahtar başına zaman aşımı (yoksa timeout). deadline verilirse o ana kadar
+    # bitmeyen cihazlar için TimeoutError döner; komutları arka planda sürer ve callback
+    # sonuç geldiğinde yine çağrılır
+    async def send(key, client):
+        try:
+            response = await client.send_command(command, expect_response,
+                                                 timeouts.get(key, timeout) if timeouts else timeout)
+        except Exception as e:
+            response = e
+        if callback:
+            callback(key, client, command, response)
+        return response
+
+    if deadline is None:
+        results = await asyncio.gather(*(send(key, client) for key, client in clients.items()))
+        return dict(zip(clients, results))
+    tasks = {key: asyncio.ensure_future(send(key, client)) for key, client in clients.items()}
+    if tasks:
+        await asyncio.wait(tasks.values(), timeout=deadline)
+    return {key: task.result() if task.done() else TimeoutError(f"No response within the {deadline} s deadline")
+            for key, task in tasks.items()}
+
+
+class SCPIEventLoop:
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name="scpi-event-loop", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        return self.submit(coro).result(timeout)
+
+    def broadcast(self, clients, command, expect_response=True, timeout=5, callback=None, deadline=None):
+        # clients sözlüğünün anlık kopyası; GUI tarafı sözlüğü değiştirebilir
+        return self.submit(broadcast(dict(clients), command, expect_response, timeout, callback, deadline))
+
+    def stop(self):
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
@@ -1,55 +1,53 @@
-import socket
-import csv
+import time
 import tkinter as tk
 from tkinter import filedialog, messagebox
+import queue
 import threading
-from scpi_commands import SCPICommands  # SCPI komutlarını içe aktarma
+from scpi_commands import SCPICommands, is_query, is_slow  # SCPI komutlarını içe aktarma
+from async_scpi_client import SCPIEventLoop
+from scpi_pool import ConnectionPool, Quarantined
+from scpi_polling import PollingScheduler, parse_float
+from measurement_log import MeasurementLogWriter
+from scpi_metrics import registry
+from rack_config import RackEntry, load
+from scpi_sequence import SequenceRunner, load_script, summarize
+from scpi_views import ResponseView, StatusTable
+from scpi_sharding import ShardedPoller
+from scpi_acquisition import SynchronizedAcquisition
+from scpi_capture import CaptureWriter
+from scpi_sweep import linear_points, run_sweeps
+
+# Tk tikinde işlenen en fazla kuyruk öğesi; taşan kısım bir sonraki tike kalır
+MAX_DRAIN = 5000
+# Aynı anda süren bağlantı denemesi sınırı (büyük raflarda SYN yığılmasını önler)
+CONNECT_LIMIT = 64
+# Yayın bu süre dolunca özetlenir; geç kalan cihazların yanıtları geldikçe yazılır
+BROADCAST_DEADLINE = 2.0
 
-class SCPISocketClient:
-    def __init__(self, name, host, port):
-        self.name = name
-        self.host = host
-        self.port = port
-        self.connection = None
-
-    def connect(self):
-        try:
-            self.connection = socket.create_connection((self.host, self.port), timeout=5)
-        except Exception as e:
-            raise ConnectionError(f"Connection to {self.host}:{self.port} failed: {e}")
-
-    def disconnect(self):
-        if self.connection:
-            self.connection.close()
-            self.connection = None
-
-    def send_command(self, command, expect_response=True, timeout=5):
-        if not self.connection:
-            raise ConnectionError(f"Not connected to {self.host}:{self.port}.")
-        try:
-            self.connection.sendall((command + '\n').encode('ascii'))
-            if expect_response:
-                self.connection.settimeout(timeout)
-                response = self.connection.recv(1024).decode('ascii').strip()
-                if not response:
-                    raise TimeoutError("No response from the device.")
-                return response
-            return "No response expected"
-        except socket.timeout:
-            raise TimeoutError("Timeout waiting for response")
-        except Exception as e:
-            raise RuntimeError(f"Error sending command to {self.host}:{self.port}: {e}")
 
 class SCPIApp:
     def __init__(self, root):
         self.root = root
         self.root.title("SCPI Socket Client - Multiport")
         self.clients = {"loads": {}, "sources": {}}
-        self.responses = {}
+        self.engine = SCPIEventLoop()
+        self.pool = ConnectionPool(callback=self.queue_pool_event)
+        self.poller = None
+        self.poll_future = None
+        # Paylaşımlı yoklama süresince GUI bağlantıları bırakılan cihazlar
+        self.released = []
+        self.logger = None
+        self.capture = None
+        self.response_queue = queue.Queue()
+        self.poll_results = {}
+        self.poll_lock = threading.Lock()
+        self.main_calls = queue.Queue()
 
         self.create_widgets()
         self.create_layout()
         self.bind_placeholder_events()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(50, self.process_responses)
 
     def create_widgets(self):
         self.ip_label = tk.Label(self.root, text="IP:")
@@ -69,7 +67,7 @@ class SCPIApp:
         self.current_label = tk.Label(self.root, text="Set Current (A):")
         self.current_entry = tk.Entry(self.root)
 
-        self.load_file_button = tk.Button(self.root, text="Load from CSV", command=self.load_from_csv)
+        self.load_file_button = tk.Button(self.root, text="Load Rack (CSV/JSON)", command=self.load_rack)
         self.connect_button = tk.Button(self.root, text="Connect", command=self.connect)
         self.disconnect_button = tk.Button(self.root, text="Disconnect", command=self.disconnect)
 
@@ -99,9 +97,42 @@ class SCPIApp:
 
         self.set_voltage_button = tk.Button(self.root, text="Set Voltage", command=self.set_voltage)
         self.set_current_button = tk.Button(self.root, text="Set Current", command=self.set_current)
-
-        self.response_text = tk.Text(self.root, height=10, width=50)
+        self.target_var = tk.StringVar(value="loads")
+        self.target_menu = tk.OptionMenu(self.root, self.target_var, "loads", "sources", "both")
+        self.ramp_label = tk.Label(self.root, text="Ramp (start:stop:points:dwell s):")
+        self.ramp_entry = tk.Entry(self.root)
+        self.ramp_entry.insert(0, "0:10:101:0.05")
+        self.ramp_voltage_button = tk.Button(self.root, text="Ramp Voltage", command=lambda: self.run_ramp("VOLT"))
+        self.ramp_current_button = tk.Button(self.root, text="Ramp Current", command=lambda: self.run_ramp("CURR"))
+
+        self.response_view = ResponseView(self.root, height=10, width=50)
+        self.status_table = StatusTable(self.root)
         self.save_button = tk.Button(self.root, text="Save Responses", command=self.save_responses)
+        self.start_log_button = tk.Button(self.root, text="Start Logging", command=self.start_logging)
+        self.stop_log_button = tk.Button(self.root, text="Stop Logging", command=self.stop_logging)
+
+        self.poll_queries_label = tk.Label(self.root, text="Poll Queries (comma-separated):")
+        self.poll_queries_entry = tk.Entry(self.root)
+        self.poll_queries_entry.insert(0, "VOLT?,CURR?,POW?")
+        self.load_poll_rate_label = tk.Label(self.root, text="Load Poll Rate (Hz):")
+        self.load_poll_rate_entry = tk.Entry(self.root)
+        self.load_poll_rate_entry.insert(0, "10")
+        self.source_poll_rate_label = tk.Label(self.root, text="Source Poll Rate (Hz):")
+        self.source_poll_rate_entry = tk.Entry(self.root)
+        self.source_poll_rate_entry.insert(0, "0")
+        self.sync_read_button = tk.Button(self.root, text="Synchronized Read (Loads)",
+                                          command=lambda: self.synchronized_read("loads"))
+        self.start_capture_button = tk.Button(self.root, text="Start Capture", command=self.start_capture)
+        self.stop_capture_button = tk.Button(self.root, text="Stop Capture", command=self.stop_capture)
+        self.poll_processes_label = tk.Label(self.root, text="Poll Processes:")
+        self.poll_processes_entry = tk.Entry(self.root)
+        self.poll_processes_entry.insert(0, "1")
+        self.start_poll_button = tk.Button(self.root, text="Start Polling", command=self.start_polling)
+        self.stop_poll_button = tk.Button(self.root, text="Stop Polling", command=self.stop_polling)
+        self.poll_status_label = tk.Label(self.root, text="Polling stopped")
+        self.metrics_button = tk.Button(self.root, text="Show Metrics", command=self.show_metrics)
+        self.load_script_button = tk.Button(self.root, text="Run Script on Loads", command=lambda: self.run_script("loads"))
+        self.source_script_button = tk.Button(self.root, text="Run Script on Sources", command=lambda: self.run_script("sources"))
 
     def create_layout(self):
         self.ip_label.grid(row=0, column=0, sticky=tk.W)
@@ -126,9 +157,35 @@ class SCPIApp:
 
         self.set_voltage_button.grid(row=3, column=2, sticky=tk.EW)
         self.set_current_button.grid(row=4, column=2, sticky=tk.EW)
-
-        self.response_text.grid(row=9, column=0, columnspan=3, sticky=tk.EW)
-        self.save_button.grid(row=10, column=0, columnspan=3, sticky=tk.EW)
+        self.target_menu.grid(row=5, column=2, sticky=tk.EW)
+
+        self.response_view.grid(row=9, column=0, columnspan=3, sticky=tk.EW)
+        self.save_button.grid(row=10, column=0, sticky=tk.EW)
+        self.start_log_button.grid(row=10, column=1, sticky=tk.EW)
+        self.stop_log_button.grid(row=10, column=2, sticky=tk.EW)
+
+        self.poll_queries_label.grid(row=11, column=0, sticky=tk.W)
+        self.poll_queries_entry.grid(row=11, column=1, sticky=tk.EW)
+        self.load_poll_rate_label.grid(row=12, column=0, sticky=tk.W)
+        self.load_poll_rate_entry.grid(row=12, column=1, sticky=tk.EW)
+        self.source_poll_rate_label.grid(row=13, column=0, sticky=tk.W)
+        self.source_poll_rate_entry.grid(row=13, column=1, sticky=tk.EW)
+        self.start_poll_button.grid(row=11, column=2, sticky=tk.EW)
+        self.stop_poll_button.grid(row=12, column=2, sticky=tk.EW)
+        self.metrics_button.grid(row=13, column=2, sticky=tk.EW)
+        self.poll_status_label.grid(row=14, column=0, columnspan=3, sticky=tk.W)
+        self.load_script_button.grid(row=15, column=0, sticky=tk.EW)
+        self.source_script_button.grid(row=15, column=1, sticky=tk.EW)
+        self.status_table.grid(row=16, column=0, columnspan=3, sticky=tk.NSEW)
+        self.poll_processes_label.grid(row=17, column=0, sticky=tk.W)
+        self.poll_processes_entry.grid(row=17, column=1, sticky=tk.EW)
+        self.sync_read_button.grid(row=15, column=2, sticky=tk.EW)
+        self.start_capture_button.grid(row=18, column=0, sticky=tk.EW)
+        self.stop_capture_button.grid(row=18, column=1, sticky=tk.EW)
+        self.ramp_label.grid(row=19, column=0, sticky=tk.W)
+        self.ramp_entry.grid(row=19, column=1, sticky=tk.EW)
+        self.ramp_voltage_button.grid(row=19, column=2, sticky=tk.EW)
+        self.ramp_current_button.grid(row=20, column=2, sticky=tk.EW)
 
     def bind_placeholder_events(self):
         self.ip_entry.bind("<FocusIn>", self.clear_ip_placeholder)
@@ -147,22 +204,21 @@ class SCPIApp:
         if self.source_ports_entry.get() == "5026":
             self.source_ports_entry.delete(0, tk.END)
 
-    def load_from_csv(self):
-        file_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
+    def load_rack(self):
+        file_path = filedialog.askopenfilename(filetypes=[("Rack configs", "*.csv *.json"), ("All files", "*.*")])
         if not file_path:
             return
 
-        with open(file_path, newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                name = row['Name']
-                ip = row['IP']
-                port = int(row['Port'])
-                device_type = row['Type'].lower()
-                client = SCPISocketClient(name, ip, port)
-                self.clients[device_type][port] = client
-
-        messagebox.showinfo("Info", "Loaded configuration from CSV successfully.")
+        try:
+            entries = load(file_path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", str(e))
+            return
+        unknown = sorted({entry.type for entry in entries} - set(self.clients))
+        if unknown:
+            messagebox.showerror("Error", f"Unknown device type(s): {', '.join(unknown)}")
+            return
+        self.connect_entries(entries)
 
     def connect(self):
         ip = self.ip_entry.get()
@@ -172,32 +228,56 @@ class SCPIApp:
             messagebox.showerror("Error", "IP and Ports must be specified.")
             return
 
-        for port in load_ports:
-            try:
-                port = int(port.strip())
-                client = SCPISocketClient(f"Load-{port}", ip, port)
-                client.connect()
-                self.clients["loads"][port] = client
-                messagebox.showinfo("Info", f"Connected to load at {ip}:{port} successfully.")
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
-
-        for port in source_ports:
-            try:
-                port = int(port.strip())
-                client = SCPISocketClient(f"Source-{port}", ip, port)
-                client.connect()
-                self.clients["sources"][port] = client
-                messagebox.showinfo("Info", f"Connected to source at {ip}:{port} successfully.")
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
+        entries = []
+        try:
+            for device_type, label, ports in (("loads", "Load", load_ports), ("sources", "Source", source_ports)):
+                for port in ports:
+                    if port.strip():
+                        port = int(port.strip())
+                        entries.append(RackEntry(f"{label}-{port}", ip, port, device_type))
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.connect_entries(entries)
+
+    def connect_entries(self, entries):
+        # Bağlantılar olay döngüsünde açılır; sonuç tek bir özet olarak ana iş parçacığına döner
+        pending = [(entry.type, self.pool.add(entry.name, entry.host, entry.port, entry.timeout)) for entry in entries]
+        future = self.engine.submit(self.pool.connect_all(CONNECT_LIMIT))
+        future.add_done_callback(lambda future: self.call_soon(self.finish_connect, pending, future))
+
+    def finish_connect(self, pending, future):
+        try:
+            results = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        failures = []
+        for device_type, client in pending:
+            key = (client.host, client.port)
+            result = results.get(key)
+            if isinstance(result, Exception):
+                failures.append(str(result))
+                self.status_table.update(client, state="failed", response=str(result))
+            elif result is not None:
+                client.capture = self.capture
+                self.clients[device_type][key] = client
+
+        connected = sum(len(clients) for clients in self.clients.values())
+        if failures:
+            shown = failures[:10] + ([f"... and {len(failures) - 10} more"] if len(failures) > 10 else [])
+            messagebox.showerror("Error", f"Connected to {connected} device(s), {len(failures)} failed:\n" + "\n".join(shown))
+        else:
+            messagebox.showinfo("Info", f"Connected to {connected} device(s) successfully.")
 
     def disconnect(self):
-        for port, client in self.clients["loads"].items():
-            client.disconnect()
-        for port, client in self.clients["sources"].items():
-            client.disconnect()
-        self.clients = {"loads": {}, "sources": {}}
+        # Yoklama kapatılan istemcileri sorgulamaya devam etmesin; sözlükler yerinde boşaltılır
+        # ki zamanlayıcı ve diğer görünümler sonraki bağlantının istemcilerini görsün
+        self.stop_polling(reconnect=False)
+        self.engine.run(self.pool.close())
+        for clients in self.clients.values():
+            clients.clear()
+        self.status_table.clear()
         messagebox.showinfo("Info", "Disconnected all connections successfully.")
 
     def send_command(self, device_type):
@@ -206,33 +286,157 @@ class SCPIApp:
             messagebox.showerror("Error", "No command selected.")
             return
 
-        expect_response = command.endswith("?")
-        self.responses.clear()
-        threads = []
+        self.broadcast(self.clients[device_type], command, is_query(command))
 
-        for port, client in self.clients[device_type].items():
-            thread = threading.Thread(target=self.send_command_to_client, args=(client, command, port, expect_response))
-            threads.append(thread)
-            thread.start()
+    def broadcast(self, clients, command, expect_response):
+        # Karantinadaki cihazlar atlanır, diğerleri gecikmelerine göre uyarlanmış zaman aşımıyla beklenir
+        # Yavaş sorgularda (*TST?, *OPC? ...) süre sınırı uygulanmaz, özet yanıtlar gelince yazılır
+        clients = dict(clients)
+        deadline = None if is_slow(command) else BROADCAST_DEADLINE
+        future = self.engine.submit(self.pool.broadcast(clients, command, expect_response,
+                                                        callback=self.queue_response, deadline=deadline))
+        future.add_done_callback(lambda future: self.queue_broadcast_summary(command, future))
+
+    def queue_broadcast_summary(self, command, future):
+        try:
+            results = future.result()
+        except Exception as e:
+            self.response_queue.put((None, command, e))
+            return
+        failed = [response for response in results.values() if isinstance(response, Exception)]
+        quarantined = sum(1 for response in failed if isinstance(response, Quarantined))
+        late = sum(1 for response in failed if isinstance(response, TimeoutError))
+        self.response_queue.put((None, command, f"{len(results) - len(failed)}/{len(results)} responded, "
+                                                f"{late} late or timed out, {quarantined} quarantined"))
+
+    def run_script(self, device_type):
+        if not self.clients[device_type]:
+            messagebox.showerror("Error", "No connected devices in this group.")
+            return
+        file_path = filedialog.askopenfilename(filetypes=[("SCPI scripts", "*.scpi *.txt"), ("All files", "*.*")])
+        if not file_path:
+            return
+        try:
+            steps = load_script(file_path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", str(e))
+            return
+        # Her cihaz betiği kendi hızında yürütür; sonuçlar geldikçe kuyruğa düşer
+        runner = SequenceRunner(self.clients[device_type], steps, callback=self.queue_response)
+        future = self.engine.submit(runner.run())
+        future.add_done_callback(lambda future: self.queue_script_result(file_path, future))
 
-        for thread in threads:
-            thread.join()
+    def queue_script_result(self, file_path, future):
+        try:
+            response = summarize(future.result())
+        except Exception as e:
+            response = e
+        self.response_queue.put((None, file_path, response))
 
-        for port, response in self.responses.items():
-            self.response_text.insert(tk.END, f"{self.clients[device_type][port].name} ({port}): {command} -> {response}\n")
+    def synchronized_read(self, device_type, quantities=("VOLT", "CURR")):
+        clients = dict(self.clients[device_type])
+        if not clients:
+            messagebox.showerror("Error", "No connected devices in this group.")
+            return
+        acquisition = SynchronizedAcquisition(clients, quantities)
+        future = self.engine.submit(acquisition.acquire())
+        future.add_done_callback(lambda future: self.call_soon(self.show_acquisition, clients, quantities, future))
 
-    def send_command_to_client(self, client, command, port, expect_response):
+    def show_acquisition(self, clients, quantities, future):
         try:
-            response = client.send_command(command, expect_response)
-            self.responses[port] = response
-        except ConnectionError as e:
-            self.responses[port] = f"Connection Error: {str(e)}"
-        except TimeoutError as e:
-            self.responses[port] = f"Timeout Error: {str(e)}"
-        except RuntimeError as e:
-            self.responses[port] = f"Runtime Error: {str(e)}"
+            result = future.result()
         except Exception as e:
-            self.responses[port] = f"Error: {str(e)}"
+            messagebox.showerror("Error", str(e))
+            return
+        first = min(result.sent.values(), default=0)
+        logger = self.logger
+        for key, client in clients.items():
+            if key in result.errors:
+                text = self.format_response(result.errors[key])
+            else:
+                values = result.values.get(key, {})
+                text = ", ".join(f"{quantity}={values.get(quantity, float('nan')):g}" for quantity in quantities)
+                text += f" (+{(result.sent[key] - first) / 1000:.0f} us)"
+                if logger:
+                    for quantity in quantities:
+                        logger.write(result.sent[key] / 1e9, client.name, client.port, f"FETC:{quantity}?",
+                                     values.get(quantity, float("nan")), float("nan"))
+            self.response_view.append(f"{client.name} ({client.port}): trigger -> {text}")
+            self.status_table.update(client, command="trigger", response=text)
+        self.response_view.append(f"--- Synchronized read: {len(result.values)}/{len(clients)} instruments, "
+                                  f"trigger skew {result.skew * 1000:.3f} ms ---")
+
+    def call_soon(self, callback, *args):
+        # Başka iş parçacıklarından gelen Tk işleri process_responses içinde çalıştırılır
+        self.main_calls.put((callback, args))
+
+    def queue_response(self, port, client, command, response):
+        # Olay döngüsü iş parçacığından çağrılır; Tk'ye yalnızca ana iş parçacığı dokunur
+        self.response_queue.put((client, command, response))
+        logger = self.logger
+        if logger and not isinstance(response, Exception):
+            logger.write(time.time(), client.name, client.port, command, parse_float(response), float("nan"))
+
+    def queue_pool_event(self, key, client, state):
+        self.response_queue.put((client, "connection", state))
+
+    def store_poll_result(self, group, key, client, responses):
+        # Yoklama sonuçları metin alanına yazılmaz; her cihazın yalnızca son sonucu tutulur
+        with self.poll_lock:
+            self.poll_results[client] = responses
+
+    def store_sharded_rows(self, clients, rows):
+        latest = {}
+        for timestamp, instrument, query, value, latency in rows:
+            latest.setdefault(instrument, {})[query] = f"{value:g}"
+        with self.poll_lock:
+            for instrument, values in latest.items():
+                self.poll_results[clients[instrument][1]] = [values[query] for query in sorted(values)]
+
+    def process_responses(self):
+        # Kuyruk toplu boşaltılır; widget'lar tik başına bir kez güncellenir
+        for _ in range(MAX_DRAIN):
+            try:
+                client, command, response = self.response_queue.get_nowait()
+            except queue.Empty:
+                break
+            text = self.format_response(response)
+            if client is None:
+                self.response_view.append(f"group: {command} -> {text}")
+                continue
+            self.response_view.append(f"{client.name} ({client.port}): {command} -> {text}")
+            if command == "connection":
+                self.status_table.update(client, state=response)
+            else:
+                self.status_table.update(client, command=command, response=text)
+        with self.poll_lock:
+            poll_results, self.poll_results = self.poll_results, {}
+        for client, responses in poll_results.items():
+            self.status_table.update(client, command="poll", response=", ".join(map(self.format_response, responses)))
+        self.response_view.flush()
+        self.status_table.flush()
+        while True:
+            try:
+                callback, args = self.main_calls.get_nowait()
+            except queue.Empty:
+                break
+            callback(*args)
+        if self.poll_future:
+            self.poll_status_label.config(text=self.format_poll_status())
+        self.root.after(50, self.process_responses)
+
+    def format_response(self, response):
+        if isinstance(response, ConnectionError):
+            return f"Connection Error: {str(response)}"
+        if isinstance(response, TimeoutError):
+            return f"Timeout Error: {str(response)}"
+        if isinstance(response, RuntimeError):
+            return f"Runtime Error: {str(response)}"
+        if isinstance(response, Exception):
+            return f"Error: {str(response)}"
+        if isinstance(response, memoryview):
+            return f"<{len(response)} byte block>"
+        return response
 
     def set_voltage(self):
         voltage = self.voltage_entry.get()
@@ -250,24 +454,172 @@ class SCPIApp:
         command = f"CURR {current}"
         self.send_custom_command(command)
 
-    def send_custom_command(self, command):
-        device_type = "loads"  # veya "sources", duruma göre değiştirin
-        self.responses.clear()
-        threads = []
+    def target_clients(self):
+        target = self.target_var.get()
+        groups = ("loads", "sources") if target == "both" else (target,)
+        return {key: client for group in groups for key, client in self.clients[group].items()}
 
-        for port, client in self.clients[device_type].items():
-            thread = threading.Thread(target=self.send_command_to_client, args=(client, command, port, False))
-            threads.append(thread)
-            thread.start()
+    def send_custom_command(self, command):
+        self.broadcast(self.target_clients(), command, False)
 
-        for thread in threads:
-            thread.join()
+    def run_ramp(self, quantity):
+        try:
+            start, stop, count, dwell = self.ramp_entry.get().split(":")
+            points = linear_points(float(start), float(stop), int(count))
+            dwell = float(dwell)
+            if not len(points) or dwell < 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Ramp must be given as start:stop:points:dwell.")
+            return
+        clients = self.target_clients()
+        if not clients:
+            messagebox.showerror("Error", "No connected devices in the selected group.")
+            return
+        # Tüm hedef cihazlar aynı çizelgeyle ilerler; her noktada ayar + ölçüm tek yazımdır
+        readback = f"MEAS:{quantity}?"
+        sweeps = {key: SCPICommands(client).sweep(quantity, points, dwell, (readback,)) for key, client in clients.items()}
+        future = self.engine.submit(run_sweeps(sweeps))
+        future.add_done_callback(lambda future: self.call_soon(self.show_ramp, clients, quantity, readback, future))
 
-        for port, response in self.responses.items():
-            self.response_text.insert(tk.END, f"{self.clients[device_type][port].name} ({port}): {command} -> {response}\n")
+    def show_ramp(self, clients, quantity, readback, future):
+        try:
+            results = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        logger = self.logger
+        for key, client in clients.items():
+            result = results[key]
+            if isinstance(result, Exception):
+                text = self.format_response(result)
+            else:
+                readings = result.readings[readback]
+                measured = [value for value in readings if value == value]
+                text = (f"{len(result.setpoints)} points {result.setpoints[0]:g} -> {result.setpoints[-1]:g}, "
+                        f"{len(measured)} readings, last {readings[-1]:g}, "
+                        f"late {result.lateness * 1000:.1f} ms, {len(result.errors)} errors")
+                if logger:
+                    for sent, value in zip(result.times, readings):
+                        if sent == sent:
+                            logger.write(sent, client.name, client.port, readback, value, float("nan"))
+            self.response_view.append(f"{client.name} ({client.port}): ramp {quantity} -> {text}")
+            self.status_table.update(client, command=f"ramp {quantity}", response=text)
+
+    def start_polling(self):
+        if self.poll_future:
+            messagebox.showwarning("Warning", "Polling is already running.")
+            return
+        queries = [query.strip() for query in self.poll_queries_entry.get().split(',') if query.strip()]
+        try:
+            rates = {"loads": float(self.load_poll_rate_entry.get() or 0),
+                     "sources": float(self.source_poll_rate_entry.get() or 0)}
+            processes = int(self.poll_processes_entry.get() or 1)
+        except ValueError:
+            messagebox.showerror("Error", "Poll rates and process count must be numbers.")
+            return
+        if not queries or not any(rates.values()):
+            messagebox.showerror("Error", "Poll queries and a poll rate must be specified.")
+            return
+        if processes > 1:
+            # Her işçi süreç cihazlara kendi bağlantısını açar. SCPI ham soket portlarının çoğu tek
+            # istemci kabul ettiğinden yoklanan cihazların GUI bağlantıları yoklama süresince
+            # kapatılır (komutlar "Not connected" döner), yoklama durunca yeniden açılır
+            clients = [(group, client) for group, group_clients in self.clients.items()
+                       for client in group_clients.values() if rates[group]]
+            entries = [RackEntry(client.name, client.host, client.port, group,
+                                 self.pool.timeouts.get((client.host, client.port))) for group, client in clients]
+            self.engine.run(self.release_clients(entries))
+            self.released = entries
+            self.poller = ShardedPoller(entries, queries, rates, processes,
+                                        callback=lambda rows: self.store_sharded_rows(clients, rows), logger=self.logger)
+        else:
+            self.poller = PollingScheduler(self.clients, queries, rates, callback=self.store_poll_result, logger=self.logger)
+        self.poll_future = self.engine.submit(self.poller.run())
+
+    def stop_polling(self, reconnect=True):
+        if self.poll_future:
+            self.poll_future.cancel()
+            self.poll_future = None
+            self.poll_status_label.config(text="Polling stopped - " + self.format_poll_status())
+        entries = self.released
+        self.released = []
+        if entries and reconnect:
+            # İşçi süreçler bağlantılarını bıraktıktan sonra GUI bağlantıları yeniden açılır
+            future = self.engine.submit(self.poller.stop_async())
+            future.add_done_callback(lambda future: self.call_soon(self.connect_entries, entries))
+
+    async def release_clients(self, entries):
+        for entry in entries:
+            await self.pool.remove((entry.host, entry.port))
+
+    def format_poll_status(self):
+        stats = list(self.poller.stats.values())
+        cycles = sum(group["cycles"] for group in stats)
+        overruns = sum(group["overruns"] for group in stats)
+        slow = sum(group.get("slow", 0) for group in stats)
+        return f"{len(self.poller.buffer)} samples, {cycles} cycles, {overruns} overruns, {slow} slow"
+
+    def start_logging(self):
+        if self.logger:
+            messagebox.showwarning("Warning", "Logging is already running.")
+            return
+        file_path = filedialog.asksaveasfilename(defaultextension=".scpilog",
+                                                 filetypes=[("Measurement logs", "*.scpilog")])
+        if not file_path:
+            return
+        self.logger = MeasurementLogWriter(file_path)
+        if self.poller:
+            self.poller.logger = self.logger
+
+    def stop_logging(self):
+        if self.logger:
+            logger = self.logger
+            self.logger = None
+            if self.poller:
+                self.poller.logger = None
+            logger.close()
+            messagebox.showinfo("Info", f"Logged {len(logger)} samples to {logger.path}.")
+
+    def start_capture(self):
+        if self.capture is not None:
+            messagebox.showwarning("Warning", "Capture is already running.")
+            return
+        file_path = filedialog.asksaveasfilename(defaultextension=".scpicap",
+                                                 filetypes=[("SCPI captures", "*.scpicap")])
+        if not file_path:
+            return
+        self.capture = CaptureWriter(file_path)
+        self.set_capture(self.capture)
+
+    def stop_capture(self):
+        if self.capture is not None:
+            capture = self.capture
+            self.capture = None
+            self.set_capture(None)
+            capture.close()
+            messagebox.showinfo("Info", f"Captured {len(capture)} exchanges to {capture.path}.")
+
+    def set_capture(self, capture):
+        for clients in self.clients.values():
+            for client in clients.values():
+                client.capture = capture
+
+    def show_metrics(self):
+        snapshots = registry.slowest(count=20)
+        if not snapshots:
+            messagebox.showinfo("Info", "No latency data yet.")
+            return
+        self.response_view.append("--- Slowest instruments (p99) ---")
+        for s in snapshots:
+            self.response_view.append(
+                f"{s['name']} ({s['host']}:{s['port']}): p50 {s['latency_p50'] * 1000:.2f} ms, "
+                f"p99 {s['latency_p99'] * 1000:.2f} ms, {s['commands_per_second']:.1f} cmd/s, "
+                f"{s['timeouts']} timeouts, {s['reconnects']} reconnects")
+        self.response_view.flush()
 
     def save_responses(self):
-        responses = self.response_text.get(1.0, tk.END)
+        responses = self.response_view.get()
         if not responses.strip():
             messagebox.showwarning("Warning", "No responses to save.")
             return
@@ -277,6 +629,22 @@ class SCPIApp:
                 f.write(responses)
             messagebox.showinfo("Info", "Responses saved successfully.")
 
+    def on_close(self):
+        self.stop_polling(reconnect=False)
+        if isinstance(self.poller, ShardedPoller):
+            # İptal edilen run() kapanışı olay döngüsünde sürdürür; süreçler ve paylaşımlı bellek bırakılsın
+            self.engine.run(self.poller.stop_async())
+        if self.logger:
+            self.logger.close()
+        if self.capture is not None:
+            self.capture.close()
+        self.engine.run(self.pool.close())
+        for clients in self.clients.values():
+            for client in clients.values():
+                self.engine.run(client.disconnect())
+        self.engine.stop()
+        self.root.destroy()
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = SCPIApp(root)
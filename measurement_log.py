@@ -0,0 +1,165 @@
+import csv
+import mmap
+import struct
+import threading
+from array import array
+
+from scpi_commands import load_numpy
+
+MAGIC = b"SCPIMLOG"
+VERSION = 1
+HEADER = struct.Struct("<8sHH")
+BLOCK = struct.Struct("<cI")
+STRING = struct.Struct("<IH")
+# timestamp, instrument name id, port, command id, value, latency
+RECORD = struct.Struct("<dIIIdd")
+FIELDS = ("timestamp", "name", "port", "command", "value", "latency")
+TYPECODES = ("d", "I", "I", "I", "d", "d")
+
+STRING_BLOCK = b"S"
+RECORD_BLOCK = b"R"
+
+
+class MeasurementLogWriter:
+    # Sabit boyutlu kayıtlar parça parça (chunk) diske yazılır; bellekte en fazla
+    # bir parça tutulur. Metinler (isim, komut) bir kez tanımlanıp id ile anılır.
+    def __init__(self, path, chunk_size=4096):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        self.strings = {}
+        self.pending_strings = bytearray()
+        self.chunk = bytearray(chunk_size * RECORD.size)
+        self.count = 0
+        self.written = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return self.written + self.count
+
+    def intern(self, text):
+        ident = self.strings.get(text)
+        if ident is None:
+            ident = self.strings[text] = len(self.strings)
+            data = text.encode("utf-8")
+            self.pending_strings += BLOCK.pack(STRING_BLOCK, STRING.size + len(data))
+            self.pending_strings += STRING.pack(ident, len(data)) + data
+        return ident
+
+    def write(self, timestamp, name, port, command, value, latency):
+        with self.lock:
+            # Kapatma ile eşzamanlı gelen örnekler sessizce düşürülür
+            if self.file is None:
+                return
+            RECORD.pack_into(self.chunk, self.count * RECORD.size, timestamp, self.intern(name), port,
+                             self.intern(command), value, latency)
+            self.count += 1
+            if self.count == self.chunk_size:
+                self._flush()
+
+    def flush(self):
+        with self.lock:
+            if self.file is not None:
+                self._flush()
+                self.file.flush()
+
+    def _flush(self):
+        if self.pending_strings:
+            self.file.write(self.pending_strings)
+            self.pending_strings.clear()
+        if self.count:
+            size = self.count * RECORD.size
+            self.file.write(BLOCK.pack(RECORD_BLOCK, size))
+            with memoryview(self.chunk) as view:
+                self.file.write(view[:size])
+            self.written += self.count
+            self.count = 0
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self._flush()
+                self.file.close()
+                self.file = None
+
+
+class MeasurementLogReader:
+    def __init__(self, path):
+        self.path = path
+        self.strings = {}
+        self.chunks = []
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if f.seek(0, 2) else None
+        self._index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return sum(size for _, size in self.chunks) // RECORD.size
+
+    def _index(self):
+        if self.map is None or len(self.map) < HEADER.size:
+            raise ValueError(f"{self.path} is not a measurement log.")
+        magic, version, record_size = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"{self.path} is not a supported measurement log.")
+        offset = HEADER.size
+        end = len(self.map)
+        while offset + BLOCK.size <= end:
+            kind, size = BLOCK.unpack_from(self.map, offset)
+            offset += BLOCK.size
+            if offset + size > end:
+                # Yarım kalmış son blok (ör. yazım sırasında kesilen kayıt)
+                break
+            if kind == STRING_BLOCK:
+                ident, length = STRING.unpack_from(self.map, offset)
+                start = offset + STRING.size
+                self.strings[ident] = self.map[start:start + length].decode("utf-8")
+            elif kind == RECORD_BLOCK:
+                self.chunks.append((offset, size))
+            offset += size
+
+    def records(self):
+        for offset, size in self.chunks:
+            with memoryview(self.map)[offset:offset + size] as view:
+                for timestamp, name, port, command, value, latency in RECORD.iter_unpack(view):
+                    yield timestamp, self.strings[name], port, self.strings[command], value, latency
+
+    def columns(self):
+        # NumPy varsa yapılandırılmış dizi, yoksa sütun başına array
+        np = load_numpy()
+        if np is not None:
+            dtype = np.dtype({"names": list(FIELDS), "formats": ["<f8", "<u4", "<u4", "<u4", "<f8", "<f8"]})
+            parts = [np.frombuffer(self.map, dtype=dtype, count=size // RECORD.size, offset=offset)
+                     for offset, size in self.chunks]
+            return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+        result = {field: array(typecode) for field, typecode in zip(FIELDS, TYPECODES)}
+        appenders = [result[field].append for field in FIELDS]
+        for offset, size in self.chunks:
+            with memoryview(self.map)[offset:offset + size] as view:
+                for row in RECORD.iter_unpack(view):
+                    for append, value in zip(appenders, row):
+                        append(value)
+        return result
+
+    def to_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+            writer.writerows(self.records())
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
@@ -0,0 +1,65 @@
+import csv
+import json
+import os
+from collections import namedtuple
+
+RackEntry = namedtuple("RackEntry", ["name", "host", "port", "type", "timeout"], defaults=(None,))
+
+
+def make_entry(name, host, port, device_type, timeout=None):
+    if not host:
+        raise ValueError("missing host")
+    timeout = float(timeout) if timeout not in (None, "") else None
+    return RackEntry(str(name), str(host).strip(), int(port), str(device_type).strip().lower(), timeout)
+
+
+def load_csv(path):
+    # load_from_csv ile aynı şema: Name,IP,Port,Type (Type: loads/sources); Timeout isteğe bağlı
+    entries = []
+    with open(path, newline="") as f:
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            try:
+                entries.append(make_entry(row["Name"], row["IP"], row["Port"], row["Type"], row.get("Timeout")))
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"{path}:{line}: invalid rack entry: {e}")
+    return check_unique(entries, path)
+
+
+def load_json(path):
+    # {"defaults": {"host": ..., "type": ..., "timeout": ...},
+    #  "instruments": [{"name": ..., "host": ..., "port": ..., "type": ..., "timeout": ...}]}
+    with open(path) as f:
+        try:
+            config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: {e}")
+    if isinstance(config, list):
+        config = {"instruments": config}
+    defaults = config.get("defaults", {})
+    entries = []
+    for index, item in enumerate(config.get("instruments", [])):
+        item = {**defaults, **item}
+        try:
+            entries.append(make_entry(item.get("name", f"{item.get('type', 'device')}-{item['port']}"),
+                                      item.get("host", item.get("ip")), item["port"], item["type"],
+                                      item.get("timeout")))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"{path}: instruments[{index}]: invalid rack entry: {e}")
+    return check_unique(entries, path)
+
+
+def load(path):
+    if os.path.splitext(path)[1].lower() == ".json":
+        return load_json(path)
+    return load_csv(path)
+
+
+def check_unique(entries, path):
+    # Aynı port farklı IP'lerde olabilir; anahtar (host, port) çiftidir
+    seen = {}
+    for entry in entries:
+        key = (entry.host, entry.port)
+        if key in seen:
+            raise ValueError(f"{path}: {entry.name} and {seen[key]} both use {entry.host}:{entry.port}")
+        seen[key] = entry.name
+    return entries
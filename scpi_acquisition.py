@@ -0,0 +1,94 @@
+import asyncio
+import gc
+import time
+from collections import namedtuple
+
+from scpi_commands import SCPICommands
+from scpi_polling import parse_float
+
+# values: {anahtar: {büyüklük: değer}}, sent: {anahtar: tetik yazım zamanı (ns, epoch)},
+# skew: ilk ve son tetik yazımı arasındaki süre (s), errors: {anahtar: istisna}
+AcquisitionResult = namedtuple("AcquisitionResult", ["values", "sent", "skew", "errors"])
+
+TRIGGER = b"*TRG\n"
+
+
+class SynchronizedAcquisition:
+    # Grup tetiklemeli ölçüm: tüm cihazlar kurulur (TRIG:SOUR BUS; INIT), *TRG bütün
+    # soketlere art arda yazılır, sonuçlar FETC? ile paralel okunur
+    def __init__(self, clients, quantities=("VOLT",), trigger_source="BUS", timeout=5):
+        self.clients = dict(clients)
+        self.quantities = list(quantities)
+        self.trigger_source = trigger_source
+        self.timeout = timeout
+
+    async def arm(self, errors):
+        async def arm_client(client):
+            async with SCPICommands(client).batch(self.timeout) as batch:
+                batch.set_trigger_source(self.trigger_source)
+                batch.initiate()
+                batch.operation_complete()
+
+        keys = list(self.clients)
+        results = await asyncio.gather(*(arm_client(self.clients[key]) for key in keys), return_exceptions=True)
+        armed = []
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                errors[key] = result
+            else:
+                armed.append(key)
+        return armed
+
+    async def fire(self, keys, errors):
+        clients = [(key, self.clients[key]) for key in keys]
+        locked = []
+        sent = {}
+        # perf_counter çözünürlüğü, epoch tabanına bir kez bağlanır
+        base = time.time_ns() - time.perf_counter_ns()
+        try:
+            # Önce tüm kilitler alınır; böylece tetik yazımları arasında hiç await olmaz
+            for key, client in clients:
+                await client.lock.acquire()
+                locked.append(client)
+            collecting = gc.isenabled()
+            gc.disable()
+            try:
+                for key, client in clients:
+                    try:
+                        client.write_nowait(TRIGGER)
+                    except Exception as e:
+                        errors[key] = e
+                        continue
+                    sent[key] = base + time.perf_counter_ns()
+            finally:
+                if collecting:
+                    gc.enable()
+        finally:
+            for client in locked:
+                client.lock.release()
+        return sent
+
+    async def fetch(self, keys, errors):
+        async def fetch_client(client):
+            async with SCPICommands(client).batch(self.timeout) as batch:
+                for quantity in self.quantities:
+                    # Okunamayan değer tüm cihazı hatalı saymasın; NaN olarak döner
+                    batch.query(f"FETC:{quantity}?", parse_float)
+            return dict(zip(self.quantities, batch.results))
+
+        results = await asyncio.gather(*(fetch_client(self.clients[key]) for key in keys), return_exceptions=True)
+        values = {}
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                errors[key] = result
+            else:
+                values[key] = result
+        return values
+
+    async def acquire(self):
+        errors = {}
+        armed = await self.arm(errors)
+        sent = await self.fire(armed, errors)
+        values = await self.fetch(list(sent), errors)
+        skew = (max(sent.values()) - min(sent.values())) / 1e9 if sent else 0.0
+        return AcquisitionResult(values, sent, skew, errors)
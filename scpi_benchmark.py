@@ -0,0 +1,278 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import platform
+import socket
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from scpi_metrics import LatencyHistogram
+
+QUERY = "VOLT?"
+WRITE = "VOLT 5"
+TELNET_QUERY = "MEAS:VOLT?"
+
+
+def raise_file_limit():
+    # 1000 bağlantı için varsayılan 1024 dosya tanımlayıcısı sınırı yetmeyebilir
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard if hard != resource.RLIM_INFINITY else 65536, hard))
+        except (ValueError, OSError):
+            pass
+
+
+def run_load_simulator(host, port):
+    from async_load_simulator import AsyncLoadSimulator
+    raise_file_limit()
+    asyncio.run(AsyncLoadSimulator(host, port).start())
+
+
+def run_telnet_simulator(host, port):
+    from telnet_simulator import SCPITelnetSimulator
+    raise_file_limit()
+    SCPITelnetSimulator(host, port).start()
+
+
+def wait_for_port(host, port, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise ConnectionError(f"Simulator on {host}:{port} did not start.")
+
+
+def start_simulator(target, host, port):
+    process = multiprocessing.Process(target=target, args=(host, port), daemon=True)
+    process.start()
+    wait_for_port(host, port)
+    return process
+
+
+def operations(kind, pipelined, batch_size, telnet=False):
+    # (komut listesi, ölçülen komut sayısı); yazma yığınlarının sonuna *OPC? eklenir
+    if telnet:
+        command = TELNET_QUERY
+    else:
+        command = QUERY if kind == "query" else WRITE
+    if not pipelined:
+        return [command], 1
+    commands = [command] * batch_size
+    if kind == "write" and not telnet:
+        commands.append("*OPC?")
+    return commands, batch_size
+
+
+def sync_worker(clients, commands, count, pipelined, deadline, histogram, lock):
+    done = 0
+    local = LatencyHistogram()
+    expect_response = commands[0].endswith("?")
+    while time.perf_counter() < deadline:
+        for client in clients:
+            started = time.perf_counter()
+            if pipelined:
+                client.send_batch(commands)
+            else:
+                client.send_command(commands[0], expect_response)
+            local.record(time.perf_counter() - started)
+            done += count
+    if not pipelined and not expect_response:
+        # Yazmalar yalnızca kuyruğa alınmış olabilir; süre cihaz işleyene kadar sayılır
+        for client in clients:
+            client.send_command("*OPC?")
+    with lock:
+        for index, value in enumerate(local.counts):
+            histogram.counts[index] += value
+        histogram.count += local.count
+        histogram.total += local.total
+        histogram.max = max(histogram.max or 0.0, local.max or 0.0)
+    return done
+
+
+def bench_sync(make_client, connections, kind, pipelined, batch_size, duration, telnet=False):
+    clients = [make_client(index) for index in range(connections)]
+    for client in clients:
+        client.connect()
+    commands, count = operations(kind, pipelined, batch_size, telnet)
+    workers = min(connections, 128)
+    groups = [clients[index::workers] for index in range(workers)]
+    histogram = LatencyHistogram()
+    lock = threading.Lock()
+    started = time.perf_counter()
+    deadline = started + duration
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            done = sum(executor.map(
+                lambda group: sync_worker(group, commands, count, pipelined, deadline, histogram, lock), groups))
+        elapsed = time.perf_counter() - started
+    finally:
+        for client in clients:
+            client.disconnect()
+    return done, elapsed, histogram
+
+
+async def bench_async(make_client, connections, kind, pipelined, batch_size, duration, telnet=False):
+    clients = [make_client(index) for index in range(connections)]
+    await asyncio.gather(*(client.connect() for client in clients))
+    commands, count = operations(kind, pipelined, batch_size, telnet)
+    expect_response = commands[0].endswith("?")
+    histogram = LatencyHistogram()
+    started = time.perf_counter()
+    deadline = started + duration
+
+    async def worker(client):
+        done = 0
+        while time.perf_counter() < deadline:
+            sent = time.perf_counter()
+            if pipelined:
+                await client.send_batch(commands)
+            else:
+                await client.send_command(commands[0], expect_response)
+            histogram.record(time.perf_counter() - sent)
+            done += count
+        if not pipelined and not expect_response:
+            await client.send_command("*OPC?")
+        return done
+
+    try:
+        done = sum(await asyncio.gather(*(worker(client) for client in clients)))
+        elapsed = time.perf_counter() - started
+    finally:
+        await asyncio.gather(*(client.disconnect() for client in clients))
+    return done, elapsed, histogram
+
+
+def run_case(client_type, host, ports, connections, kind, pipelined, batch_size, duration):
+    if client_type == "async":
+        from async_scpi_client import AsyncSCPIClient
+        return asyncio.run(bench_async(lambda index: AsyncSCPIClient(f"bench-{index}", host, ports["load"]),
+                                       connections, kind, pipelined, batch_size, duration))
+    if client_type == "socket":
+        from scpi_socket_client import SCPISocketClient
+        return bench_sync(lambda index: SCPISocketClient(f"bench-{index}", host, ports["load"]),
+                          connections, kind, pipelined, batch_size, duration)
+    if client_type == "telnet":
+        from scpi_telnet_client import SCPITelnetClient
+        return bench_sync(lambda index: SCPITelnetClient(host, ports["telnet"]),
+                          connections, kind, pipelined, batch_size, duration, telnet=True)
+    if client_type == "telnet-async":
+        from scpi_telnet_client import AsyncSCPITelnetClient
+        return asyncio.run(bench_async(lambda index: AsyncSCPITelnetClient(host, ports["telnet"]),
+                                       connections, kind, pipelined, batch_size, duration, telnet=True))
+    raise ValueError(f"Unknown client type: {client_type}")
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {case_key(case): case for case in json.load(f)["results"]}
+    for case in results:
+        previous = baseline.get(case_key(case))
+        if not previous or not previous["commands_per_second"]:
+            continue
+        ratio = case["commands_per_second"] / previous["commands_per_second"]
+        print(f"{describe(case)}: {ratio:.2f}x throughput vs baseline")
+
+
+def case_key(case):
+    return case["client"], case["connections"], case["command"], case["pipelined"]
+
+
+def describe(case):
+    mode = "pipelined" if case["pipelined"] else "single"
+    return f"{case['client']:12} {case['connections']:5} conn {case['command']:5} {mode:9}"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Throughput/latency benchmark against the bundled simulators")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5525, help="load simulator port; telnet simulator uses port+1")
+    parser.add_argument("--clients", default="socket,async,telnet,telnet-async")
+    parser.add_argument("--connections", default="1,10,100")
+    parser.add_argument("--commands", default="query,write")
+    parser.add_argument("--modes", default="single,pipelined")
+    parser.add_argument("--batch", type=int, default=20, help="commands per pipelined batch")
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds per case")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    raise_file_limit()
+    client_types = [name.strip() for name in args.clients.split(",") if name.strip()]
+    ports = {"load": args.port, "telnet": args.port + 1}
+    simulators = [start_simulator(run_load_simulator, args.host, ports["load"])]
+    if any(client_type.startswith("telnet") for client_type in client_types):
+        simulators.append(start_simulator(run_telnet_simulator, args.host, ports["telnet"]))
+
+    results = []
+    try:
+        for client_type in client_types:
+            for connections in (int(value) for value in args.connections.split(",")):
+                for kind in args.commands.split(","):
+                    for mode in args.modes.split(","):
+                        if client_type.startswith("telnet") and kind == "write":
+                            # Telnet simülatörü yalnızca sorguları tanır
+                            continue
+                        pipelined = mode == "pipelined"
+                        done, elapsed, histogram = run_case(client_type, args.host, ports, connections, kind,
+                                                            pipelined, args.batch, args.duration)
+                        case = {
+                            "client": client_type,
+                            "connections": connections,
+                            "command": kind,
+                            "pipelined": pipelined,
+                            "batch": args.batch if pipelined else 1,
+                            "commands": done,
+                            "seconds": elapsed,
+                            "commands_per_second": done / elapsed if elapsed else 0.0,
+                            "latency_p50": histogram.percentile(50),
+                            "latency_p99": histogram.percentile(99),
+                            "latency_max": histogram.max,
+                        }
+                        results.append(case)
+                        p50 = (case["latency_p50"] or 0) * 1000
+                        p99 = (case["latency_p99"] or 0) * 1000
+                        print(f"{describe(case)}: {case['commands_per_second']:10.0f} cmd/s  "
+                              f"p50 {p50:7.3f} ms  p99 {p99:7.3f} ms")
+    finally:
+        for process in simulators:
+            process.terminate()
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "duration": args.duration,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
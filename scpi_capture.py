@@ -0,0 +1,150 @@
+import mmap
+import struct
+import threading
+from collections import namedtuple
+
+MAGIC = b"SCPICAPT"
+VERSION = 1
+HEADER = struct.Struct("<8sHH")
+BLOCK = struct.Struct("<cI")
+# bağlantı id, port, isim uzunluğu, host uzunluğu
+CONNECTION = struct.Struct("<IIHH")
+# bağlantı id, gönderim ns, yanıt ns, tür, komut uzunluğu, yanıt uzunluğu
+EXCHANGE = struct.Struct("<IqqBII")
+
+CONNECTION_BLOCK = b"C"
+EXCHANGE_BLOCK = b"X"
+
+NO_RESPONSE = 0
+TEXT = 1
+BINARY = 2
+FAILED = 3
+
+Exchange = namedtuple("Exchange", ["connection", "name", "host", "port", "sent", "received", "kind", "command",
+                                   "response"])
+
+
+class CaptureWriter:
+    # Her komut/yanıt çifti nanosaniye zaman damgalarıyla kaydedilir; kayıtlar bellekte
+    # biriktirilip chunk_size baytı aşınca diske yazılır
+    def __init__(self, path, chunk_size=1 << 16):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, EXCHANGE.size))
+        self.connections = {}
+        self.pending = bytearray()
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def _connection(self, client):
+        key = (client.host, client.port)
+        ident = self.connections.get(key)
+        if ident is None:
+            ident = self.connections[key] = len(self.connections)
+            name = client.name.encode("utf-8")
+            host = client.host.encode("utf-8")
+            self.pending += BLOCK.pack(CONNECTION_BLOCK, CONNECTION.size + len(name) + len(host))
+            self.pending += CONNECTION.pack(ident, client.port, len(name), len(host)) + name + host
+        return ident
+
+    def record(self, client, command, sent, received, response):
+        # response: str (metin), bytes/memoryview (binary blok), None (yanıt beklenmedi), istisna (başarısız)
+        if response is None:
+            kind, payload = NO_RESPONSE, b""
+        elif isinstance(response, str):
+            kind, payload = TEXT, response.encode("utf-8")
+        elif isinstance(response, (bytes, bytearray, memoryview)):
+            kind, payload = BINARY, bytes(response)
+        else:
+            kind, payload = FAILED, str(response).encode("utf-8")
+        data = command.encode("utf-8")
+        with self.lock:
+            if self.file is None:
+                return
+            ident = self._connection(client)
+            self.pending += BLOCK.pack(EXCHANGE_BLOCK, EXCHANGE.size + len(data) + len(payload))
+            self.pending += EXCHANGE.pack(ident, sent, received, kind, len(data), len(payload))
+            self.pending += data
+            self.pending += payload
+            self.count += 1
+            if len(self.pending) >= self.chunk_size:
+                self._flush()
+
+    def flush(self):
+        with self.lock:
+            if self.file is not None:
+                self._flush()
+                self.file.flush()
+
+    def _flush(self):
+        if self.pending:
+            self.file.write(self.pending)
+            self.pending.clear()
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self._flush()
+                self.file.close()
+                self.file = None
+
+
+class CaptureReader:
+    def __init__(self, path):
+        self.path = path
+        self.connections = {}
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if f.seek(0, 2) else None
+        if self.map is None or len(self.map) < HEADER.size:
+            raise ValueError(f"{path} is not a capture file.")
+        magic, version, exchange_size = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION or exchange_size != EXCHANGE.size:
+            raise ValueError(f"{path} is not a supported capture file.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __iter__(self):
+        offset = HEADER.size
+        end = len(self.map)
+        while offset + BLOCK.size <= end:
+            kind, size = BLOCK.unpack_from(self.map, offset)
+            offset += BLOCK.size
+            if offset + size > end:
+                # Yarım kalmış son blok
+                break
+            if kind == CONNECTION_BLOCK:
+                ident, port, name_size, host_size = CONNECTION.unpack_from(self.map, offset)
+                start = offset + CONNECTION.size
+                name = self.map[start:start + name_size].decode("utf-8")
+                host = self.map[start + name_size:start + name_size + host_size].decode("utf-8")
+                self.connections[ident] = (name, host, port)
+            elif kind == EXCHANGE_BLOCK:
+                ident, sent, received, response_kind, command_size, response_size = \
+                    EXCHANGE.unpack_from(self.map, offset)
+                start = offset + EXCHANGE.size
+                command = self.map[start:start + command_size].decode("utf-8")
+                response = self.map[start + command_size:start + command_size + response_size]
+                if response_kind != BINARY:
+                    response = response.decode("utf-8") if response_kind != NO_RESPONSE else None
+                name, host, port = self.connections[ident]
+                yield Exchange(ident, name, host, port, sent, received, response_kind, command, response)
+            offset += size
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
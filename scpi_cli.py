@@ -0,0 +1,144 @@
+import argparse
+import sys
+
+# tkinter ve ağır modüller burada içe aktarılmaz; istemci katmanı main() içinde yüklenir
+
+
+def read_script(path):
+    # Satır başına bir komut ya da @wait/@sync/@check/@barrier yönergesi (scpi_sequence)
+    from scpi_sequence import load_script, parse_script
+    if path == "-":
+        return parse_script(sys.stdin.read(), "<stdin>")
+    return load_script(path)
+
+
+def format_response(response):
+    if isinstance(response, ConnectionError):
+        return f"Connection Error: {response}"
+    if isinstance(response, TimeoutError):
+        return f"Timeout Error: {response}"
+    if isinstance(response, Exception):
+        return f"Error: {response}"
+    if isinstance(response, memoryview):
+        return f"<{len(response)} byte block>"
+    return response
+
+
+class Output:
+    def __init__(self, stream, as_json=False):
+        self.stream = stream
+        self.as_json = as_json
+        self.failures = 0
+
+    def emit(self, client, command, response):
+        if isinstance(response, Exception):
+            self.failures += 1
+        if self.as_json:
+            import json
+            line = json.dumps({
+                "name": client.name,
+                "host": client.host,
+                "port": client.port,
+                "command": command,
+                "response": format_response(response),
+                "ok": not isinstance(response, Exception),
+            })
+        else:
+            line = f"{client.name}\t{client.host}:{client.port}\t{command}\t{format_response(response)}"
+        self.stream.write(line + "\n")
+        self.stream.flush()
+
+
+async def run_batch(client, commands, output, timeout):
+    try:
+        responses = await client.send_batch(commands, timeout)
+    except Exception as e:
+        responses = [e] * len(commands)
+    for command, response in zip(commands, responses):
+        output.emit(client, command, response)
+
+
+async def run(entries, steps, output, timeout=5, batch=False, limit=None, capture=None):
+    import asyncio
+    from scpi_pool import ConnectionPool
+    from scpi_sequence import SequenceRunner
+
+    # Tek seferlik çalıştırmada sağlık denetimi gerekmez
+    pool = ConnectionPool(timeout=timeout, health_interval=0)
+    for entry in entries:
+        client = pool.add(entry.name, entry.host, entry.port, entry.timeout)
+        client.capture = capture
+    clients = dict(pool.clients)
+    try:
+        connected = {}
+        for key, result in (await pool.connect_all(limit)).items():
+            if isinstance(result, Exception):
+                output.emit(clients[key], "connect", result)
+            else:
+                connected[key] = result
+        if batch:
+            commands = [step.command for step in steps]
+            await asyncio.gather(*(run_batch(client, commands, output, timeout) for client in connected.values()))
+        else:
+            runner = SequenceRunner(connected, steps, timeout,
+                                    callback=lambda key, client, step, result: output.emit(client, step, result))
+            await runner.run()
+    finally:
+        await pool.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m scpi_cli",
+                                     description="Run SCPI commands against every instrument in a rack")
+    parser.add_argument("rack", help="rack CSV (Name,IP,Port,Type) or JSON file")
+    parser.add_argument("-c", "--command", action="append", default=[], help="command to send (repeatable)")
+    parser.add_argument("-s", "--script", help="sequence file with one step per line ('-' for stdin)")
+    parser.add_argument("-t", "--type", action="append", help="only instruments of this Type (e.g. loads)")
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--limit", type=int, default=64, help="concurrent connection attempts")
+    parser.add_argument("--batch", action="store_true", help="pipeline the whole script in one write per instrument")
+    parser.add_argument("--json", action="store_true", help="write one JSON object per response")
+    parser.add_argument("--capture", help="record every command/response with timestamps to this file")
+    args = parser.parse_args(argv)
+    if not args.command and not args.script:
+        parser.error("at least one --command or a --script is required")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    import asyncio
+    from rack_config import load
+    from scpi_sequence import parse_script
+
+    try:
+        entries = load(args.rack)
+        steps = parse_script("\n".join(args.command), "--command")
+        if args.script:
+            steps += read_script(args.script)
+    except (OSError, ValueError) as e:
+        sys.stderr.write(f"{e}\n")
+        return 2
+    if args.batch and any(step.kind != "command" for step in steps):
+        sys.stderr.write("--batch only supports plain SCPI commands\n")
+        return 2
+    if args.type:
+        types = {value.lower() for value in args.type}
+        entries = [entry for entry in entries if entry.type in types]
+    output = Output(sys.stdout, args.json)
+    capture = None
+    if args.capture:
+        from scpi_capture import CaptureWriter
+        capture = CaptureWriter(args.capture)
+    try:
+        asyncio.run(run(entries, steps, output, args.timeout, args.batch, args.limit, capture))
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if capture is not None:
+            capture.close()
+    return 1 if output.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import time
+
+from scpi_commands import cache_key, resets_instrument
+from scpi_framing import ResponseBuffer
+from scpi_metrics import registry
+
+NO_RESPONSE_EXPECTED = "No response expected"
+
+
+class SCPIClientBase:
+    # asyncio ve soket istemcilerinin ortak kayıt işleri: yanıt önbelleği, metrikler,
+    # yakalama ve hata dönüşümü. G/Ç (drop dahil) alt sınıflarda kalır
+    def __init__(self, name, host, port):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.buffer = ResponseBuffer()
+        self.generation = 0
+        # Yanıtı gelmeyen sorgudan sonra bağlantı bırakıldı; sıradaki komut yeniden bağlanır
+        self.resync = False
+        # *IDN? gibi değişmeyen sorguların yanıtları (bağlantı başına, *RST ile temizlenir)
+        self.cache = {}
+        self.metrics = registry.connection(name, host, port)
+        # scpi_capture.CaptureWriter atanırsa her komut/yanıt kaydedilir
+        self.capture = None
+
+    def reset_session(self):
+        # Yeni bağlantı: önceki bağlantının tamponu ve önbelleği geçersizdir
+        self.buffer.clear()
+        self.resync = False
+        self.cache.clear()
+        self.generation += 1
+
+    def not_connected(self):
+        return ConnectionError(f"Not connected to {self.host}:{self.port}.")
+
+    def cached(self, command, expect_response=True):
+        # Önbellekteki yanıt (yoksa None)
+        if expect_response:
+            key = cache_key(command)
+            if key is not None and key in self.cache:
+                return self.cache[key]
+        self.invalidate((command,))
+        return None
+
+    def invalidate(self, commands):
+        # *RST içeren komut (birleşik mesaj içinde de olsa) önbelleği temizler
+        if any(resets_instrument(command) for command in commands):
+            self.cache.clear()
+
+    def answered(self, command, sent, response):
+        # response None ise komut yanıt beklemiyordu
+        if self.capture is not None:
+            self.capture.record(self, command, sent, sent if response is None else time.time_ns(), response)
+        if isinstance(response, str):
+            key = cache_key(command)
+            if key is not None:
+                self.cache[key] = response
+
+    def failure(self, error, commands, sent, pending, what):
+        # Yakalanan hatayı kaydeder ve çağıranın yükselteceği istisnayı döndürür.
+        # commands: yanıtı alınamayan komutlar (yakalamaya başarısız olarak yazılır)
+        if isinstance(error, TimeoutError):
+            if pending:
+                # Geç yanıt ya da hiç gelmeyecek yanıt sonraki sorgulara karışmasın diye
+                # bağlantı kapatılır (ör. bilinmeyen sorgu yalnızca hata kuyruğuna yazılır)
+                self.drop()
+            self.metrics.timeout()
+            if self.capture is not None:
+                received = time.time_ns()
+                for command in commands:
+                    self.capture.record(self, command, sent, received, error)
+            return TimeoutError("Timeout waiting for response")
+        self.metrics.error()
+        if isinstance(error, ConnectionError):
+            return error
+        return RuntimeError(f"Error sending {what} to {self.host}:{self.port}: {error}")
@@ -1,11 +1,187 @@
+import inspect
+from array import array
+from collections import namedtuple
+
+_numpy = None
+
+Identity = namedtuple("Identity", ["manufacturer", "model", "serial", "firmware"])
+
+
+def load_numpy():
+    # NumPy ilk dizi çözümlemesinde yüklenir; içe aktarma süresi başlangıca eklenmesin
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def is_query(command):
+    # Birleşik mesajda herhangi bir bölüm sorguysa yanıt beklenir ("VOLT 5;CURR?")
+    if "?" not in command:
+        return False
+    if ";" not in command:
+        header = command.strip().split(None, 1)
+        return bool(header) and header[0].endswith("?")
+    return any(segment.split(None, 1)[0].endswith("?") for segment in split_commands(command))
+
+
+# İstemci başına önbelleğe alınan, bağlantı boyunca değişmeyen sorgular
+CACHED_QUERIES = frozenset(("*IDN?", "SYST:VERS?", "SYSTEM:VERSION?"))
+
+
+def cache_key(command):
+    key = command.strip().lstrip(":").upper()
+    return key if key in CACHED_QUERIES else None
+
+
+def resets_instrument(command):
+    # *RST içeren mesaj (birleşik olsa da) önbelleği geçersiz kılar
+    if "*RST" not in command.upper():
+        return False
+    return any(segment.split(None, 1)[0].upper() == "*RST" for segment in split_commands(command))
+
+
+# Uzun süren sorgular; uyarlanır zaman aşımı bunlara uygulanmaz
+SLOW_COMMANDS = frozenset(("*OPC?", "*TST?", "*CAL?", "*WAI"))
+
+
+def is_slow(command):
+    if "*" not in command:
+        return False
+    return any(segment.lstrip(":").split(None, 1)[0].upper() in SLOW_COMMANDS
+               for segment in split_commands(command))
+
+
+def join_commands(commands):
+    # Birleşik komutta her komut kökten başlasın (":" önekli), aksi halde
+    # SCPI yol kuralları gereği bir önceki komutun düğümüne göre çözülür
+    first, *rest = commands
+    return ";".join([first] + [c if c.startswith((":", "*")) else ":" + c for c in rest])
+
+
+def split_commands(message):
+    # join_commands'ın tersi; tırnak içindeki ';' karakterleri bölünmez
+    commands = []
+    start = 0
+    quote = None
+    for index, char in enumerate(message):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == ";":
+            commands.append(message[start:index].strip())
+            start = index + 1
+    commands.append(message[start:].strip())
+    return [command for command in commands if command]
+
+
+def pipeline(commands, join=True):
+    # Sorgu içeren her komut ayrı satırdır ve tek yanıt satırı (ya da blok) üretir;
+    # send_batch bu yüzden sorgu içeren satır başına bir çerçeve okur
+    lines = []
+    group = []
+    for command in commands:
+        if join and not is_query(command):
+            group.append(command)
+            continue
+        if group:
+            lines.append(join_commands(group))
+            group = []
+        lines.append(command)
+    if group:
+        lines.append(join_commands(group))
+    return ("\n".join(lines) + "\n").encode("ascii")
+
+
+def parse_bool(response):
+    value = response.strip().upper()
+    if value in ("1", "ON"):
+        return True
+    if value in ("0", "OFF"):
+        return False
+    raise ValueError(f"Not a boolean response: {response!r}")
+
+
+def parse_list(response):
+    return [item.strip() for item in response.split(",")]
+
+
+def parse_idn(response):
+    fields = parse_list(response) + [""] * 4
+    return Identity(*fields[:4])
+
+
+def parse_array(response, dtype="d"):
+    # Binary blok (#...) yanıtları doğrudan tampondan, metin listeleri tek geçişte çevrilir
+    np = load_numpy()
+    if isinstance(response, memoryview):
+        if np is not None:
+            return np.frombuffer(response, dtype=dtype)
+        values = array(dtype)
+        values.frombytes(response)
+        return values
+    if np is not None:
+        return np.array(response.split(","), dtype=dtype)
+    return array(dtype, map(float if dtype in "fd" else int, response.split(",")))
+
+
 class SCPICommands:
     def __init__(self, client):
         self.client = client
+        self.is_async = inspect.iscoroutinefunction(client.send_command)
+
+    def query(self, command, parser=None):
+        response = self.client.send_command(command)
+        if self.is_async:
+            return self._parse_async(response, parser)
+        return parser(response) if parser else response
+
+    async def _parse_async(self, response, parser):
+        response = await response
+        return parser(response) if parser else response
+
+    def cached_query(self, command, parser=None):
+        # Önbellek istemcidedir (cihaz başına, bağlantı yenilenince ve *RST ile temizlenir);
+        # böylece aynı istemciyi kullanan her SCPICommands örneği onu paylaşır
+        return self.query(command, parser)
+
+    def invalidate_cache(self):
+        cache = getattr(self.client, "cache", None)
+        if cache is not None:
+            cache.clear()
+
+    # Tipli sorgular
+    def query_float(self, command):
+        return self.query(command, float)
+
+    def query_int(self, command):
+        return self.query(command, lambda response: int(float(response)))
+
+    def query_bool(self, command):
+        return self.query(command, parse_bool)
+
+    def query_list(self, command):
+        return self.query(command, parse_list)
+
+    def query_array(self, command, dtype="d"):
+        return self.query(command, lambda response: parse_array(response, dtype))
+
+    def fetch_array(self, dtype="d"):
+        return self.query_array("FETC:ARR?", dtype)
 
     # Genel Komutlar
     def identify(self):
-        return self.client.send_command("*IDN?")
-    
+        return self.cached_query("*IDN?")
+
+    def identity(self):
+        return self.cached_query("*IDN?", parse_idn)
+
     def reset(self):
         return self.client.send_command("*RST", expect_response=False)
 
@@ -17,7 +193,7 @@ class SCPICommands:
         return self.client.send_command("SYST:LOC", expect_response=False)
 
     def system_version(self):
-        return self.client.send_command("SYST:VERS?")
+        return self.cached_query("SYST:VERS?")
 
     def system_error(self):
         return self.client.send_command("SYST:ERR?")
@@ -40,3 +216,105 @@ class SCPICommands:
 
     def get_current(self):
         return self.client.send_command("CURR?")
+
+    # Tetikleme Komutları
+    def set_trigger_source(self, source="BUS"):
+        return self.client.send_command(f"TRIG:SOUR {source}", expect_response=False)
+
+    def initiate(self):
+        return self.client.send_command("INIT", expect_response=False)
+
+    def trigger(self):
+        return self.client.send_command("*TRG", expect_response=False)
+
+    def abort(self):
+        return self.client.send_command("ABOR", expect_response=False)
+
+    def fetch(self, quantity="VOLT"):
+        return self.query_float(f"FETC:{quantity}?")
+
+    def operation_complete(self):
+        return self.query("*OPC?")
+
+    # Tarama ve liste kipi
+    def set_mode(self, quantity="VOLT", mode="FIX"):
+        return self.client.send_command(f"{quantity}:MODE {mode}", expect_response=False)
+
+    def upload_list(self, quantity, points, dwell=None):
+        # Tüm liste tek mesajda yüklenir; cihaz tetiklendiğinde noktaları kendi zamanlamasıyla uygular
+        from scpi_sweep import format_points
+        commands = [f"LIST:{quantity} {format_points(points)}"]
+        if dwell is not None:
+            commands.append(f"LIST:DWEL {float(dwell)!r}")
+        return self.client.send_command(join_commands(commands), expect_response=False)
+
+    def sweep(self, quantity, points, dwell=0.0, readback=(), timeout=5, chunk=64):
+        # Sweep.run() senkron istemcide sonucu, asenkron istemcide coroutine döndürür
+        from scpi_sweep import Sweep
+        return Sweep(self.client, quantity, points, dwell, readback, timeout, chunk)
+
+    def ramp(self, quantity, start, stop, slew, interval, readback=(), timeout=5):
+        from scpi_sweep import ramp_points
+        return self.sweep(quantity, ramp_points(start, stop, slew, interval), interval, readback, timeout)
+
+    # Toplu gönderim
+    def batch(self, timeout=5, join=True):
+        return CommandBatch(self.client, timeout, join, parent=self)
+
+
+class CommandRecorder:
+    def __init__(self):
+        self.commands = []
+        # Komutla aynı sırada; tipli sorgunun yanıt çözümleyicisi (yoksa None)
+        self.parsers = []
+
+    def send_command(self, command, expect_response=True, timeout=5, parser=None):
+        self.commands.append(command)
+        self.parsers.append(parser)
+
+
+class CommandBatch(SCPICommands):
+    def __init__(self, target, timeout=5, join=True, parent=None):
+        super().__init__(CommandRecorder())
+        self.target = target
+        self.timeout = timeout
+        self.join = join
+        self.parent = parent
+        self.results = None
+
+    # Toplu kipte sorgular yalnızca kaydedilir; yanıtlar çözümleyicilerinden geçirilip
+    # results içinde döner (query_float -> float, identity -> Identity ...)
+    def query(self, command, parser=None):
+        self.client.send_command(command, parser=parser)
+
+    def cached_query(self, command, parser=None):
+        self.client.send_command(command, parser=parser)
+
+    def invalidate_cache(self):
+        if self.parent:
+            self.parent.invalidate_cache()
+
+    @property
+    def commands(self):
+        return self.client.commands
+
+    def send(self, command):
+        self.client.send_command(command)
+
+    def __enter__(self):
+        return self
+
+    def parse(self, responses):
+        return [parser(response) if parser else response
+                for parser, response in zip(self.client.parsers, responses)]
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None and self.commands:
+            self.results = self.parse(self.target.send_batch(self.commands, self.timeout, self.join))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None and self.commands:
+            self.results = self.parse(await self.target.send_batch(self.commands, self.timeout, self.join))
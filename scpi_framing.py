@@ -0,0 +1,121 @@
+HASH = 0x23
+NEWLINE = 0x0A
+CARRIAGE_RETURN = 0x0D
+ZERO = 0x30
+NINE = 0x39
+
+RECV_SIZE = 65536
+
+
+class FramingError(ConnectionError):
+    # Akış çözümlenemez durumda; tampon temizlenir, bağlantı yeniden kurulmalıdır
+    pass
+
+
+class ResponseBuffer:
+    # Satır sonlu (\n) yanıtlar ve IEEE 488.2 #<n><len><data> blokları için
+    # bağlantı başına alım tamponu. Tamponda kalan veri bir sonraki yanıta aittir.
+    def __init__(self):
+        self.buffer = bytearray()
+        self.start = 0
+        self.skip_terminator = False
+
+    def __len__(self):
+        return len(self.buffer) - self.start
+
+    def clear(self):
+        self.buffer.clear()
+        self.start = 0
+        self.skip_terminator = False
+
+    def feed(self, data):
+        if self.start and self.start >= len(self.buffer) // 2:
+            del self.buffer[:self.start]
+            self.start = 0
+        self.buffer += data
+
+    def pending(self):
+        # Eksik bir bloğu tamamlamak için gereken bayt sayısı (bilinmiyorsa 0)
+        header = self._block_header()
+        if header is None:
+            return 0
+        data_start, length = header
+        if length is None:
+            return 0
+        return max(0, data_start + length - len(self.buffer))
+
+    def next_frame(self):
+        if self.skip_terminator:
+            self._skip_terminator()
+        buf = self.buffer
+        start = self.start
+        if len(buf) - start >= 2 and buf[start] == HASH and ZERO <= buf[start + 1] <= NINE:
+            return self._next_block()
+        end = buf.find(b'\n', start)
+        if end < 0:
+            return None
+        with memoryview(buf) as view:
+            line = view[start:end].tobytes()
+        self.start = end + 1
+        return line
+
+    def _skip_terminator(self):
+        buf = self.buffer
+        while self.start < len(buf):
+            byte = buf[self.start]
+            if byte == CARRIAGE_RETURN:
+                self.start += 1
+            elif byte == NEWLINE:
+                self.start += 1
+                self.skip_terminator = False
+                return
+            else:
+                self.skip_terminator = False
+                return
+
+    def _block_header(self):
+        buf = self.buffer
+        start = self.start
+        if len(buf) - start < 2 or buf[start] != HASH or not ZERO <= buf[start + 1] <= NINE:
+            return None
+        digits = buf[start + 1] - ZERO
+        if digits == 0:
+            return start + 2, None
+        data_start = start + 2 + digits
+        if len(buf) < data_start:
+            return None
+        length = buf[start + 2:data_start]
+        if not length.isdigit():
+            header = bytes(buf[start:data_start])
+            self.clear()
+            raise FramingError(f"Malformed block header: {header!r}")
+        return data_start, int(length)
+
+    def _next_block(self):
+        header = self._block_header()
+        if header is None:
+            return None
+        data_start, length = header
+        buf = self.buffer
+        if length is None:
+            # #0 belirsiz uzunluklu blok: satır sonuna kadar
+            data_end = buf.find(b'\n', data_start)
+            if data_end < 0:
+                return None
+            next_start = data_end + 1
+        else:
+            data_end = data_start + length
+            if len(buf) < data_end:
+                return None
+            next_start = data_end
+            self.skip_terminator = True
+        with memoryview(buf) as view:
+            data = view[data_start:data_end].tobytes()
+        self.start = next_start
+        return memoryview(data)
+
+
+def decode_frame(frame):
+    if isinstance(frame, memoryview):
+        return frame
+    return frame.decode('ascii').strip()
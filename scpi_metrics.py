@@ -0,0 +1,239 @@
+import asyncio
+import threading
+import time
+from array import array
+
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_VALUE_BITS = 40
+BUCKETS = (MAX_VALUE_BITS - SUB_BUCKET_BITS + 1) * SUB_BUCKETS
+# Uyarlanır zaman aşımı: yeterli örnek toplanana kadar varsayılan kullanılır, p99 her
+# ADAPTIVE_REFRESH örnekte bir yeniden hesaplanır
+ADAPTIVE_SAMPLES = 20
+ADAPTIVE_REFRESH = 32
+
+
+class LatencyHistogram:
+    # HDR benzeri log-lineer histogram: mikrosaniye çözünürlük, her ikinin kuvveti
+    # aralığında 32 alt kova (~%3 hassasiyet), sabit bellek
+    def __init__(self):
+        self.counts = array("Q", [0]) * BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    @staticmethod
+    def bucket(micros):
+        # micros >> shift her zaman 32..63 aralığındadır (shift 0 iken 0..63); böylece her
+        # ikinin kuvveti aralığı 32 kovanın hepsini kullanır ve indeksler ardışıktır
+        shift = max(0, micros.bit_length() - SUB_BUCKET_BITS - 1)
+        return min((shift << SUB_BUCKET_BITS) + (micros >> shift), BUCKETS - 1)
+
+    @staticmethod
+    def bucket_value(index):
+        shift = max(0, (index >> SUB_BUCKET_BITS) - 1)
+        low = (index - (shift << SUB_BUCKET_BITS)) << shift
+        return (low + (1 << shift) / 2) / 1e6 if shift else low / 1e6
+
+    def record(self, seconds):
+        self.counts[self.bucket(max(0, int(seconds * 1e6)))] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, percent):
+        if not self.count:
+            return None
+        target = max(1, self.count * percent / 100)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                seen += count
+                if seen >= target:
+                    return min(self.bucket_value(index), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def reset(self):
+        for index in range(len(self.counts)):
+            self.counts[index] = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+
+class ConnectionMetrics:
+    def __init__(self, name, host, port):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.latency = LatencyHistogram()
+        self.commands = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.reconnects = 0
+        self.started = time.monotonic()
+        self.adaptive = (0, None)
+        self.lock = threading.Lock()
+
+    def record(self, commands, latency=None):
+        with self.lock:
+            self.commands += commands
+            if latency is not None:
+                self.latency.record(latency)
+
+    def sent(self, size):
+        self.bytes_out += size
+
+    def received(self, size):
+        self.bytes_in += size
+
+    def timeout(self):
+        with self.lock:
+            self.timeouts += 1
+
+    def error(self):
+        with self.lock:
+            self.errors += 1
+
+    def reconnect(self):
+        with self.lock:
+            self.reconnects += 1
+
+    def adaptive_timeout(self, default, multiplier=4, minimum=1.0):
+        # Gözlenen p99'un katı; default üst sınırdır, minimum yavaş sorgular için taban
+        with self.lock:
+            count = self.latency.count
+            if count < ADAPTIVE_SAMPLES:
+                return default
+            refreshed, p99 = self.adaptive
+            if p99 is None or count - refreshed >= ADAPTIVE_REFRESH:
+                p99 = self.latency.percentile(99)
+                self.adaptive = (count, p99)
+        return min(default, max(minimum, multiplier * p99))
+
+    def rate(self):
+        elapsed = time.monotonic() - self.started
+        return self.commands / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "name": self.name,
+                "host": self.host,
+                "port": self.port,
+                "commands": self.commands,
+                "commands_per_second": self.rate(),
+                "bytes_out": self.bytes_out,
+                "bytes_in": self.bytes_in,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "reconnects": self.reconnects,
+                "latency_count": self.latency.count,
+                "latency_mean": self.latency.mean,
+                "latency_p50": self.latency.percentile(50),
+                "latency_p99": self.latency.percentile(99),
+                "latency_max": self.latency.max,
+            }
+
+    def reset(self):
+        with self.lock:
+            self.latency.reset()
+            self.commands = self.bytes_out = self.bytes_in = 0
+            self.timeouts = self.errors = self.reconnects = 0
+            self.adaptive = (0, None)
+            self.started = time.monotonic()
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.connections = {}
+        self.lock = threading.Lock()
+
+    def connection(self, name, host, port):
+        key = (host, port)
+        with self.lock:
+            metrics = self.connections.get(key)
+            if metrics is None:
+                metrics = self.connections[key] = ConnectionMetrics(name, host, port)
+            return metrics
+
+    def snapshot(self):
+        with self.lock:
+            connections = list(self.connections.values())
+        return [metrics.snapshot() for metrics in connections]
+
+    def slowest(self, count=10, field="latency_p99"):
+        snapshots = [s for s in self.snapshot() if s["latency_count"]]
+        return sorted(snapshots, key=lambda s: s[field], reverse=True)[:count]
+
+    def reset(self):
+        with self.lock:
+            connections = list(self.connections.values())
+        for metrics in connections:
+            metrics.reset()
+
+    def prometheus_text(self):
+        lines = []
+        counters = (
+            ("scpi_commands_total", "commands", "Commands sent."),
+            ("scpi_bytes_sent_total", "bytes_out", "Bytes written to the instrument."),
+            ("scpi_bytes_received_total", "bytes_in", "Bytes read from the instrument."),
+            ("scpi_timeouts_total", "timeouts", "Commands that timed out."),
+            ("scpi_errors_total", "errors", "Commands that failed."),
+            ("scpi_reconnects_total", "reconnects", "Reconnects after a lost connection."),
+        )
+        snapshots = self.snapshot()
+        for metric, field, help_text in counters:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for s in snapshots:
+                lines.append(f"{metric}{{{self._labels(s)}}} {s[field]}")
+        lines.append("# HELP scpi_latency_seconds Command round-trip latency.")
+        lines.append("# TYPE scpi_latency_seconds summary")
+        for s in snapshots:
+            labels = self._labels(s)
+            for quantile, field in (("0.5", "latency_p50"), ("0.99", "latency_p99")):
+                if s[field] is not None:
+                    lines.append(f'scpi_latency_seconds{{{labels},quantile="{quantile}"}} {s[field]:.6f}')
+            total = (s["latency_mean"] or 0.0) * s["latency_count"]
+            lines.append(f"scpi_latency_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"scpi_latency_seconds_count{{{labels}}} {s['latency_count']}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _labels(snapshot):
+        name = snapshot["name"].replace("\\", "\\\\").replace('"', '\\"')
+        return f'instrument="{name}",host="{snapshot["host"]}",port="{snapshot["port"]}"'
+
+    async def serve_prometheus(self, host="127.0.0.1", port=9105):
+        async def handle(reader, writer):
+            try:
+                await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                pass
+            body = self.prometheus_text().encode("utf-8")
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                         + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("ascii") + body)
+            await writer.drain()
+            writer.close()
+
+        return await asyncio.start_server(handle, host, port)
+
+    async def dump_periodically(self, interval, callback):
+        while True:
+            await asyncio.sleep(interval)
+            callback(self.snapshot())
+
+
+registry = MetricsRegistry()
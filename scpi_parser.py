@@ -0,0 +1,159 @@
+import itertools
+import re
+
+TOKEN = re.compile(r"(\[?):?([A-Za-z*]+)(#?)\]?")
+CACHE_SIZE = 4096
+
+
+class SCPIError(Exception):
+    def __init__(self, code, message):
+        super().__init__(f"{code},\"{message}\"")
+        self.code = code
+        self.message = message
+        self.entry = f"{code},\"{message}\""
+
+
+UNDEFINED_HEADER = -113, "Undefined header"
+MISSING_PARAMETER = -109, "Missing parameter"
+ILLEGAL_PARAMETER = -224, "Illegal parameter value"
+TRIGGER_IGNORED = -211, "Trigger ignored"
+DATA_STALE = -230, "Data corrupt or stale"
+
+
+class CommandNode:
+    __slots__ = ("children", "suffix", "setter", "getter")
+
+    def __init__(self, suffix=False):
+        self.children = {}
+        self.suffix = suffix
+        self.setter = None
+        self.getter = None
+
+
+def short_form(mnemonic):
+    return mnemonic.rstrip("abcdefghijklmnopqrstuvwxyz")
+
+
+def mnemonic_forms(mnemonic):
+    # "VOLTage" -> {"VOLT", "VOLTAGE"}; kısa biçim büyük harfli önektir
+    return {short_form(mnemonic).upper(), mnemonic.upper()}
+
+
+class CommandTree:
+    # Komut kalıpları ("[:SOURce]:VOLTage[:LEVel]", "OUTPut#[:STATe]", "*IDN") bir kez
+    # ağaca derlenir; çözümleme başlık derinliği kadar sözlük aramasıdır
+    def __init__(self, commands):
+        self.root = CommandNode()
+        self.common = {}
+        self.cache = {}
+        for pattern, setter, getter in commands:
+            self.add(pattern, setter, getter)
+
+    def add(self, pattern, setter=None, getter=None):
+        if pattern.startswith("*"):
+            node = self.common.setdefault(pattern.upper(), CommandNode())
+            self._assign(node, setter, getter)
+            return
+        tokens = [(optional == "[", name, suffix == "#") for optional, name, suffix in TOKEN.findall(pattern)]
+        optional = [index for index, token in enumerate(tokens) if token[0]]
+        # İsteğe bağlı düğümlerin her kombinasyonu ayrı bir yol olarak eklenir
+        for skipped in itertools.product((False, True), repeat=len(optional)):
+            omit = {index for index, skip in zip(optional, skipped) if skip}
+            node = self.root
+            for index, (_, name, suffix) in enumerate(tokens):
+                if index in omit:
+                    continue
+                forms = mnemonic_forms(name)
+                child = next((node.children[form] for form in forms if form in node.children), None)
+                if child is None:
+                    child = CommandNode(suffix)
+                for form in forms:
+                    node.children[form] = child
+                node = child
+            self._assign(node, setter, getter)
+        self.cache.clear()
+
+    @staticmethod
+    def _assign(node, setter, getter):
+        if setter:
+            node.setter = setter
+        if getter:
+            node.getter = getter
+
+    def resolve(self, header):
+        cached = self.cache.get(header)
+        if cached is not None:
+            return cached
+        query = header.endswith("?")
+        path = (header[:-1] if query else header).upper()
+        suffixes = []
+        if path.startswith("*"):
+            node = self.common.get(path)
+        else:
+            node = self.root
+            for token in path.lstrip(":").split(":"):
+                child = node.children.get(token)
+                if child is None:
+                    base = token.rstrip("0123456789")
+                    child = node.children.get(base)
+                    if child is None or not child.suffix or base == token:
+                        raise SCPIError(*UNDEFINED_HEADER)
+                    suffixes.append(int(token[len(base):]))
+                elif child.suffix:
+                    suffixes.append(1)
+                node = child
+        handler = None if node is None else node.getter if query else node.setter
+        if handler is None:
+            raise SCPIError(*UNDEFINED_HEADER)
+        result = handler, tuple(suffixes)
+        if len(self.cache) < CACHE_SIZE:
+            self.cache[header] = result
+        return result
+
+    def dispatch(self, target, message):
+        header, _, params = message.strip().partition(" ")
+        handler, suffixes = self.resolve(header)
+        params = params.strip()
+        args = [arg.strip() for arg in params.split(",")] if params else []
+        return getattr(target, handler)(args, suffixes)
+
+
+def number_arg(args, index=0):
+    if len(args) <= index:
+        raise SCPIError(*MISSING_PARAMETER)
+    try:
+        return float(args[index])
+    except ValueError:
+        raise SCPIError(*ILLEGAL_PARAMETER)
+
+
+def numbers_arg(args):
+    # Virgülle ayrılmış sayı listesi (ör. LIST:VOLT 1,2,3)
+    if not args:
+        raise SCPIError(*MISSING_PARAMETER)
+    try:
+        return [float(arg) for arg in args]
+    except ValueError:
+        raise SCPIError(*ILLEGAL_PARAMETER)
+
+
+def bool_arg(args, index=0):
+    if len(args) <= index:
+        raise SCPIError(*MISSING_PARAMETER)
+    value = args[index].upper()
+    if value in ("1", "ON"):
+        return True
+    if value in ("0", "OFF"):
+        return False
+    raise SCPIError(*ILLEGAL_PARAMETER)
+
+
+def choice_arg(args, choices, index=0):
+    # choices: SCPI mnemonic listesi, ör. ("CURRent", "RESistance")
+    if len(args) <= index:
+        raise SCPIError(*MISSING_PARAMETER)
+    value = args[index].upper()
+    for choice in choices:
+        if value in mnemonic_forms(choice):
+            return short_form(choice)
+    raise SCPIError(*ILLEGAL_PARAMETER)
@@ -0,0 +1,177 @@
+import asyncio
+import math
+import threading
+import time
+from array import array
+
+# Gruba eklenen/çıkarılan cihazların yoklamaya alınma aralığı
+SCAN_INTERVAL = 0.5
+
+MEASUREMENT_COLUMNS = (
+    ("timestamp", "d"),
+    ("instrument", "i"),
+    ("query", "i"),
+    ("value", "d"),
+    ("latency", "d"),
+)
+
+
+class ColumnarRingBuffer:
+    def __init__(self, capacity, columns=MEASUREMENT_COLUMNS):
+        self.capacity = capacity
+        self.names = [name for name, _ in columns]
+        self.columns = {name: array(typecode, [0]) * capacity for name, typecode in columns}
+        self.index = 0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.count
+
+    def append(self, *row):
+        with self.lock:
+            for name, value in zip(self.names, row):
+                self.columns[name][self.index] = value
+            self.index = (self.index + 1) % self.capacity
+            if self.count < self.capacity:
+                self.count += 1
+
+    def extend(self, rows):
+        # Toplu ekleme; kilit bir kez alınır
+        with self.lock:
+            columns = [self.columns[name] for name in self.names]
+            for row in rows:
+                for column, value in zip(columns, row):
+                    column[self.index] = value
+                self.index = (self.index + 1) % self.capacity
+                if self.count < self.capacity:
+                    self.count += 1
+
+    def tail(self, n=None):
+        # Sütunları kronolojik sırada kopyalar (en eski -> en yeni)
+        with self.lock:
+            n = self.count if n is None else min(n, self.count)
+            start = (self.index - n) % self.capacity
+            result = {}
+            for name, column in self.columns.items():
+                if start + n <= self.capacity:
+                    result[name] = column[start:start + n]
+                else:
+                    result[name] = column[start:] + column[:self.index]
+            return result
+
+    def clear(self):
+        with self.lock:
+            self.index = 0
+            self.count = 0
+
+
+def parse_float(response):
+    try:
+        return float(response)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class PollingScheduler:
+    def __init__(self, clients, queries, rates, timeout=1, capacity=100000, callback=None, logger=None, buffer=None):
+        # clients: SCPIApp.clients gibi {"loads": {port: client}, "sources": {...}}
+        # rates: grup başına Hz cinsinden örnekleme hızı
+        self.clients = clients
+        self.queries = list(queries)
+        self.rates = rates
+        self.timeout = timeout
+        self.callback = callback
+        self.logger = logger
+        # buffer: append(*row) sunan herhangi bir nesne (ör. scpi_sharding.SharedRingBuffer)
+        self.buffer = ColumnarRingBuffer(capacity) if buffer is None else buffer
+        self.instruments = []
+        self.instrument_ids = {}
+        self.stats = {}
+
+    def instrument_id(self, group, key, client):
+        ident = (group, key)
+        if ident not in self.instrument_ids:
+            self.instrument_ids[ident] = len(self.instruments)
+            self.instruments.append((group, key, client.name))
+        return self.instrument_ids[ident]
+
+    async def run(self):
+        groups = [group for group, rate in self.rates.items() if rate and self.clients.get(group)]
+        await asyncio.gather(*(self.poll_group(group, self.rates[group]) for group in groups))
+
+    async def poll_group(self, group, rate):
+        # Her cihaz kendi tik döngüsünde yoklanır; yanıt vermeyen bir cihaz yalnızca kendi
+        # tiklerini kaçırır, gruptaki diğer cihazların çizelgesi etkilenmez
+        loop = asyncio.get_running_loop()
+        period = 1.0 / rate
+        stats = self.stats[group] = {"cycles": 0, "overruns": 0, "skipped": 0, "max_lateness": 0.0, "slow": 0}
+        start = loop.time()
+        tasks = {}
+        try:
+            while True:
+                clients = self.clients.get(group, {})
+                for key, client in list(clients.items()):
+                    current = tasks.get(key)
+                    if current is None or current[0] is not client or current[1].done():
+                        if current is not None:
+                            current[1].cancel()
+                        task = loop.create_task(self.poll_instrument(group, key, client, start, period, stats))
+                        tasks[key] = (client, task)
+                for key in [key for key in tasks if key not in clients]:
+                    tasks.pop(key)[1].cancel()
+                await asyncio.sleep(max(period, SCAN_INTERVAL))
+        finally:
+            for _, task in tasks.values():
+                task.cancel()
+
+    async def poll_instrument(self, group, key, client, start, period, stats):
+        loop = asyncio.get_running_loop()
+        # Gruba sonradan katılan cihaz hemen yoklanır, sonra ortak tik çizelgesine oturur
+        tick = math.floor((loop.time() - start) / period)
+        first = True
+        slow = False
+        try:
+            while True:
+                delay = start + tick * period - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                elif not first:
+                    stats["max_lateness"] = max(stats["max_lateness"], -delay)
+                first = False
+                await self.poll_client(group, key, client)
+                tick += 1
+                stats["cycles"] = max(stats["cycles"], tick)
+
+                # Kayma telafisi: yoklama periyodu aştıysa kaçırılan tikler atlanır
+                due = math.floor((loop.time() - start) / period) + 1
+                if due > tick:
+                    stats["overruns"] += 1
+                    stats["skipped"] += due - tick
+                    tick = due
+                    if not slow:
+                        slow = True
+                        stats["slow"] += 1
+                elif slow:
+                    slow = False
+                    stats["slow"] -= 1
+        finally:
+            if slow:
+                stats["slow"] -= 1
+
+    async def poll_client(self, group, key, client):
+        instrument = self.instrument_id(group, key, client)
+        sent = time.perf_counter()
+        try:
+            responses = await client.send_batch(self.queries, self.timeout)
+        except Exception as e:
+            responses = [e] * len(self.queries)
+        latency = time.perf_counter() - sent
+        timestamp = time.time()
+        for query, response in enumerate(responses):
+            value = parse_float(response)
+            self.buffer.append(timestamp, instrument, query, value, latency)
+            if self.logger:
+                self.logger.write(timestamp, client.name, client.port, self.queries[query], value, latency)
+        if self.callback:
+            self.callback(group, key, client, responses)
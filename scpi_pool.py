@@ -0,0 +1,246 @@
+import asyncio
+import random
+import time
+
+from async_scpi_client import AsyncSCPIClient, broadcast
+from scpi_commands import is_slow
+
+
+class Quarantined(ConnectionError):
+    pass
+
+
+class CircuitBreaker:
+    # threshold ardışık hatadan sonra açılır (cihaz karantinada); ilk başarılı
+    # komut ya da yoklama devreyi yeniden kapatır
+    def __init__(self, threshold=3):
+        self.threshold = threshold
+        self.failures = 0
+        self.opened = None
+
+    @property
+    def open(self):
+        return self.opened is not None
+
+    def success(self):
+        # Devre açıktıysa True: cihaz karantinadan çıktı
+        was_open = self.open
+        self.failures = 0
+        self.opened = None
+        return was_open
+
+    def failure(self):
+        # Devre bu hatayla açıldıysa True
+        self.failures += 1
+        if self.failures >= self.threshold and not self.open:
+            self.opened = time.monotonic()
+            return True
+        return False
+
+
+class ConnectionPool:
+    def __init__(self, timeout=5, health_interval=10, probe_command="*OPC?",
+                 initial_backoff=0.5, max_backoff=30, callback=None, failure_threshold=3,
+                 adaptive_multiplier=4, adaptive_minimum=1.0):
+        self.timeout = timeout
+        self.health_interval = health_interval
+        self.probe_command = probe_command
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.callback = callback
+        self.failure_threshold = failure_threshold
+        self.adaptive_multiplier = adaptive_multiplier
+        self.adaptive_minimum = adaptive_minimum
+        self.clients = {}
+        self.timeouts = {}
+        self.tasks = {}
+        self.breakers = {}
+        self.probes = {}
+
+    def __len__(self):
+        return len(self.clients)
+
+    def get(self, host, port):
+        return self.clients.get((host, port))
+
+    def add(self, name, host, port, timeout=None):
+        key = (host, port)
+        client = self.clients.get(key)
+        if client is None:
+            client = AsyncSCPIClient(name, host, port)
+            self.clients[key] = client
+        if timeout:
+            self.timeouts[key] = timeout
+        return client
+
+    def connect_timeout(self, key):
+        return self.timeouts.get(key, self.timeout)
+
+    def command_timeout(self, client, timeout=None, minimum=None):
+        # Cihazın gözlenen gecikmesinden türetilir; timeout (yoksa havuzunki) üst sınırdır
+        return client.metrics.adaptive_timeout(timeout or self.timeout, self.adaptive_multiplier,
+                                               minimum or self.adaptive_minimum)
+
+    def breaker(self, key):
+        breaker = self.breakers.get(key)
+        if breaker is None:
+            breaker = self.breakers[key] = CircuitBreaker(self.failure_threshold)
+        return breaker
+
+    def quarantined(self, key):
+        breaker = self.breakers.get(key)
+        return breaker is not None and breaker.open
+
+    def record(self, key, client, response):
+        breaker = self.breaker(key)
+        if not isinstance(response, Exception):
+            if breaker.success():
+                self._notify(key, client, "restored")
+        elif breaker.failure():
+            self._notify(key, client, "quarantined")
+            if key not in self.probes:
+                self.probes[key] = asyncio.get_running_loop().create_task(self._reprobe(key, client))
+
+    async def broadcast(self, clients, command, expect_response=True, timeout=None, callback=None, deadline=None,
+                        adaptive=True, minimum=None):
+        # Karantinadaki cihazlar atlanır (arka planda yoklanır); kalanlar uyarlanır zaman
+        # aşımıyla gönderilir. Atlananlar sonuçta Quarantined olarak görünür. adaptive=False
+        # ya da yavaş sorgular (*OPC?, *TST?...) tam timeout ile beklenir; minimum tabanı yükseltir
+        active = {}
+        results = {}
+        for key, client in clients.items():
+            if self.quarantined(key):
+                breaker = self.breakers[key]
+                results[key] = Quarantined(f"{client.host}:{client.port} is quarantined after "
+                                           f"{breaker.failures} consecutive failures.")
+            else:
+                active[key] = client
+        timeouts = None
+        if adaptive and not is_slow(command):
+            timeouts = {key: self.command_timeout(client, timeout, minimum) for key, client in active.items()}
+
+        done = set()
+        missed = set()
+
+        def record(key, client, command, response):
+            # Süreyi kaçıran cihazın hatası zaten sayıldı; geç gelen başarı devreyi yine kapatır
+            done.add(key)
+            if key not in missed or not isinstance(response, Exception):
+                self.record(key, client, response)
+            if callback:
+                callback(key, client, command, response)
+
+        finished = await broadcast(active, command, expect_response, timeout or self.timeout, record, deadline,
+                                   timeouts)
+        for key in finished.keys() - done:
+            missed.add(key)
+            self.record(key, active[key], finished[key])
+        results.update(finished)
+        return results
+
+    async def connect(self, key):
+        client = self.clients[key]
+        if not client.connected:
+            try:
+                await client.connect(self.connect_timeout(key))
+            except ConnectionError:
+                del self.clients[key]
+                self.timeouts.pop(key, None)
+                raise
+        self._watch(key)
+        self._notify(key, client, "connected")
+        return client
+
+    async def connect_all(self, limit=None):
+        # Bağlantılar paralel açılır; limit aynı anda süren bağlantı denemesi sayısını sınırlar
+        keys = list(self.clients)
+        semaphore = asyncio.Semaphore(limit) if limit else None
+
+        async def connect(key):
+            if semaphore is None:
+                return await self.connect(key)
+            async with semaphore:
+                return await self.connect(key)
+
+        results = await asyncio.gather(*(connect(key) for key in keys), return_exceptions=True)
+        return dict(zip(keys, results))
+
+    async def remove(self, key):
+        for tasks in (self.tasks, self.probes):
+            task = tasks.pop(key, None)
+            if task:
+                task.cancel()
+        self.timeouts.pop(key, None)
+        self.breakers.pop(key, None)
+        client = self.clients.pop(key, None)
+        if client:
+            await client.disconnect()
+
+    async def close(self):
+        for key in list(self.clients):
+            await self.remove(key)
+
+    async def probe(self, client):
+        # Zaman aşımıyla bırakılan bağlantıyı (resync) yoklama komutu yeniden açar
+        if not client.connected and not client.resync:
+            return False
+        try:
+            await client.send_command(self.probe_command, True, self.timeout)
+            return True
+        except Exception:
+            return False
+
+    def _watch(self, key):
+        if self.health_interval and key not in self.tasks:
+            self.tasks[key] = asyncio.get_running_loop().create_task(self._monitor(key))
+
+    def _notify(self, key, client, state):
+        if self.callback:
+            self.callback(key, client, state)
+
+    async def _monitor(self, key):
+        client = self.clients[key]
+        while True:
+            await asyncio.sleep(self.health_interval)
+            # Son aralıkta trafik gördüyse bağlantı canlıdır, ek sorgu gerekmez
+            idle = time.monotonic() - (client.last_activity or 0)
+            if client.connected and idle < self.health_interval:
+                continue
+            if await self.probe(client):
+                continue
+            self._notify(key, client, "lost")
+            await client.disconnect()
+            await self._reconnect(key, client)
+
+    async def _reprobe(self, key, client):
+        # Karantinadaki cihaz geri çekilmeli aralıklarla yoklanır; bağlantı koptuysa ve
+        # sağlık izleyicisi yoksa yeniden bağlanmayı da burada dener
+        delay = self.initial_backoff
+        try:
+            while self.quarantined(key):
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+                delay = min(delay * 2, self.max_backoff)
+                if not client.connected and not client.resync and key not in self.tasks:
+                    try:
+                        await client.connect(self.connect_timeout(key))
+                    except ConnectionError:
+                        continue
+                    client.metrics.reconnect()
+                if await self.probe(client) and self.breakers[key].success():
+                    self._notify(key, client, "restored")
+        finally:
+            if self.probes.get(key) is asyncio.current_task():
+                del self.probes[key]
+
+    async def _reconnect(self, key, client):
+        delay = self.initial_backoff
+        while True:
+            try:
+                await client.connect(self.connect_timeout(key))
+            except ConnectionError:
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+                delay = min(delay * 2, self.max_backoff)
+                continue
+            client.metrics.reconnect()
+            self._notify(key, client, "reconnected")
+            return
@@ -0,0 +1,173 @@
+import asyncio
+import math
+import operator
+import re
+import time
+from collections import namedtuple
+
+from scpi_commands import is_query
+from scpi_polling import parse_float
+
+# Betik satırı başına bir adım: SCPI komutu ya da '@' ile başlayan yönerge
+#   @wait 0.5                 bekle (yalnızca bu cihazın zaman çizelgesi)
+#   @sync [timeout]           *OPC? ile cihazın işlemleri bitirmesini bekle
+#   @check MEAS:VOLT? > 4.5   sorgu sonucunu karşılaştır, tutmazsa adım başarısız
+#   @barrier [name]           gruptaki tüm cihazlar buraya gelene kadar bekle
+Step = namedtuple("Step", ["kind", "command", "argument", "text"])
+TimelineResult = namedtuple("TimelineResult", ["completed", "responses", "error", "elapsed"])
+
+CHECK = re.compile(r"^(.+?\?)\s*(<=|>=|==|!=|<|>)\s*(.+)$")
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+class CheckFailed(Exception):
+    pass
+
+
+def parse_script(text, source="<script>"):
+    steps = []
+    for number, raw in enumerate(text.splitlines(), start=1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        if not line.startswith("@"):
+            steps.append(Step("command", line, None, line))
+            continue
+        directive, _, rest = line[1:].partition(" ")
+        directive = directive.lower()
+        rest = rest.strip()
+        try:
+            if directive == "wait":
+                steps.append(Step("wait", None, float(rest), line))
+            elif directive == "sync":
+                steps.append(Step("sync", "*OPC?", float(rest) if rest else None, line))
+            elif directive == "barrier":
+                steps.append(Step("barrier", None, rest or None, line))
+            elif directive == "check":
+                match = CHECK.match(rest)
+                if not match:
+                    raise ValueError("expected '@check <query?> <op> <value>'")
+                query, op, expected = match.groups()
+                steps.append(Step("check", query.strip(), (op, expected.strip()), line))
+            else:
+                raise ValueError(f"unknown directive @{directive}")
+        except ValueError as e:
+            raise ValueError(f"{source}:{number}: {e}")
+    return steps
+
+
+def load_script(path):
+    with open(path) as f:
+        return parse_script(f.read(), path)
+
+
+def compare(response, op, expected):
+    # İki taraf da sayıysa sayısal, değilse metin karşılaştırması
+    actual = parse_float(response)
+    target = parse_float(expected)
+    if not math.isnan(actual) and not math.isnan(target):
+        return OPERATORS[op](actual, target)
+    return OPERATORS[op](str(response).strip().strip('"'), expected.strip('"'))
+
+
+class Barrier:
+    # Yarıda kalan bir cihaz leave() ile ayrılır; diğerleri onu beklemez
+    def __init__(self, parties):
+        self.parties = parties
+        self.arrived = 0
+        self.released = asyncio.Event()
+
+    def _check(self):
+        if self.arrived >= self.parties:
+            self.released.set()
+
+    async def wait(self):
+        self.arrived += 1
+        self._check()
+        await self.released.wait()
+
+    def leave(self):
+        self.parties -= 1
+        self._check()
+
+
+class SequenceRunner:
+    # Her cihaz betiği kendi hızında yürütür; gruplar yalnızca @barrier adımlarında
+    # birbirini bekler, en yavaş cihaz her adımda tüm rafı durdurmaz
+    def __init__(self, clients, steps, timeout=5, sync_timeout=60, stop_on_failure=True, callback=None):
+        self.clients = dict(clients)
+        self.steps = list(steps)
+        self.timeout = timeout
+        self.sync_timeout = sync_timeout
+        self.stop_on_failure = stop_on_failure
+        self.callback = callback
+
+    async def run(self):
+        keys = list(self.clients)
+        barriers = {index: Barrier(len(keys)) for index, step in enumerate(self.steps) if step.kind == "barrier"}
+        results = await asyncio.gather(*(self.run_timeline(key, self.clients[key], barriers) for key in keys))
+        return dict(zip(keys, results))
+
+    async def run_timeline(self, key, client, barriers):
+        started = time.monotonic()
+        responses = []
+        error = None
+        arrived = set()
+        completed = False
+        try:
+            for index, step in enumerate(self.steps):
+                if step.kind == "barrier":
+                    arrived.add(index)
+                try:
+                    result = await self.execute(client, step, barriers.get(index))
+                except Exception as e:
+                    result = e
+                responses.append(result)
+                if self.callback:
+                    self.callback(key, client, step.text, result)
+                if isinstance(result, Exception):
+                    error = error or result
+                    if self.stop_on_failure or isinstance(result, ConnectionError):
+                        break
+            else:
+                completed = error is None
+        finally:
+            for index, barrier in barriers.items():
+                if index not in arrived:
+                    barrier.leave()
+        return TimelineResult(completed, responses, error, time.monotonic() - started)
+
+    async def execute(self, client, step, barrier=None):
+        if step.kind == "command":
+            return await client.send_command(step.command, is_query(step.command), self.timeout)
+        if step.kind == "wait":
+            await asyncio.sleep(step.argument)
+            return "OK"
+        if step.kind == "sync":
+            response = await client.send_command(step.command, True, step.argument or self.sync_timeout)
+            if response.strip() != "1":
+                raise CheckFailed(f"*OPC? returned {response!r}")
+            return response
+        if step.kind == "check":
+            response = await client.send_command(step.command, True, self.timeout)
+            op, expected = step.argument
+            if not compare(response, op, expected):
+                raise CheckFailed(f"{step.command} returned {response}, expected {op} {expected}")
+            return response
+        if step.kind == "barrier":
+            await barrier.wait()
+            return "OK"
+        raise ValueError(f"Unknown step kind: {step.kind}")
+
+
+def summarize(results):
+    completed = sum(1 for result in results.values() if result.completed)
+    slowest = max((result.elapsed for result in results.values()), default=0.0)
+    return f"{completed}/{len(results)} instruments completed in {slowest:.2f} s"
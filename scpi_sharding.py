@@ -0,0 +1,231 @@
+import asyncio
+import multiprocessing
+import os
+import struct
+from multiprocessing import shared_memory
+
+from scpi_polling import ColumnarRingBuffer, PollingScheduler
+from scpi_pool import ConnectionPool
+
+# written, cycles, overruns, connected
+HEADER = struct.Struct("<QQQQ")
+COUNTER = struct.Struct("<Q")
+# timestamp, instrument, query, value, latency (MEASUREMENT_COLUMNS ile aynı sıra)
+RECORD = struct.Struct("<dIIdd")
+CONNECT_LIMIT = 64
+STATS_INTERVAL = 0.2
+
+
+class SharedRingBuffer:
+    # Tek üretici (işçi süreç) / tek tüketici (koordinatör) halka. Kayıtlar paylaşımlı
+    # bellekte sabit boyutludur; yazma sayacı kayıt yazıldıktan sonra güncellenir,
+    # tüketici geride kalırsa en eski kayıtlar düşürülür ve sayılır
+    def __init__(self, capacity=65536, name=None):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=HEADER.size + capacity * RECORD.size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.capacity = capacity
+        self.written = COUNTER.unpack_from(self.shm.buf, 0)[0]
+        self.read = 0
+        self.dropped = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def append(self, timestamp, instrument, query, value, latency):
+        offset = HEADER.size + (self.written % self.capacity) * RECORD.size
+        RECORD.pack_into(self.shm.buf, offset, timestamp, instrument, query, value, latency)
+        self.written += 1
+        COUNTER.pack_into(self.shm.buf, 0, self.written)
+
+    def publish(self, cycles, overruns, connected):
+        struct.pack_into("<QQQ", self.shm.buf, COUNTER.size, cycles, overruns, connected)
+
+    def stats(self):
+        written, cycles, overruns, connected = HEADER.unpack_from(self.shm.buf, 0)
+        return {"written": written, "cycles": cycles, "overruns": overruns, "connected": connected,
+                "dropped": self.dropped}
+
+    def drain(self):
+        buf = self.shm.buf
+        written = COUNTER.unpack_from(buf, 0)[0]
+        start = self.read
+        if written - start > self.capacity:
+            self.dropped += written - start - self.capacity
+            start = written - self.capacity
+        count = written - start
+        if not count:
+            return []
+        first = start % self.capacity
+        head = min(count, self.capacity - first)
+        data = bytes(buf[HEADER.size + first * RECORD.size:HEADER.size + (first + head) * RECORD.size])
+        if head < count:
+            data += bytes(buf[HEADER.size:HEADER.size + (count - head) * RECORD.size])
+        # Kopyalama sürerken üretici halkayı dolaştıysa üzerine yazılmış olabilecek en eski kayıtlar atılır
+        overwritten = COUNTER.unpack_from(buf, 0)[0] + 1 - self.capacity - start
+        if overwritten > 0:
+            overwritten = min(overwritten, count)
+            self.dropped += overwritten
+            data = data[overwritten * RECORD.size:]
+        self.read = written
+        return list(RECORD.iter_unpack(data))
+
+    def close(self):
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+async def poll_shard(entries, queries, rates, timeout, ring, stop_event):
+    pool = ConnectionPool(timeout=timeout)
+    clients = {}
+    scheduler = PollingScheduler(clients, queries, rates, timeout, buffer=ring)
+    # Yerel kimlikler girdi sırasıyla verilir; koordinatör bunları genel kimliğe çevirir
+    for entry in entries:
+        client = pool.add(entry.name, entry.host, entry.port, entry.timeout)
+        scheduler.instrument_id(entry.type, (entry.host, entry.port), client)
+    results = await pool.connect_all(CONNECT_LIMIT)
+    for entry in entries:
+        key = (entry.host, entry.port)
+        if not isinstance(results.get(key), Exception):
+            clients.setdefault(entry.type, {})[key] = pool.clients[key]
+    connected = sum(len(group) for group in clients.values())
+    task = asyncio.ensure_future(scheduler.run())
+    try:
+        while not stop_event.is_set() and not task.done():
+            stats = list(scheduler.stats.values())
+            ring.publish(sum(group["cycles"] for group in stats), sum(group["overruns"] for group in stats), connected)
+            await asyncio.sleep(STATS_INTERVAL)
+    finally:
+        task.cancel()
+        await pool.close()
+
+
+def run_worker(entries, queries, rates, timeout, ring_name, capacity, stop_event):
+    ring = SharedRingBuffer(capacity, ring_name)
+    try:
+        asyncio.run(poll_shard(entries, queries, rates, timeout, ring, stop_event))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.close()
+
+
+class ShardedPoller:
+    # PollingScheduler ile aynı arayüz (run, buffer, stats, logger); cihazlar süreçlere
+    # sırayla dağıtılır, her süreç kendi olay döngüsü ve bağlantılarıyla yoklar.
+    # Sonuçlar paylaşımlı bellek halkalarından toplu okunur, metin pickle edilmez.
+    # entries: rack_config.RackEntry listesi; type alanı rates içindeki grubu seçer
+    def __init__(self, entries, queries, rates, processes=None, timeout=1, capacity=100000,
+                 ring_capacity=65536, callback=None, logger=None):
+        self.entries = [entry for entry in entries if rates.get(entry.type)]
+        self.queries = list(queries)
+        self.rates = rates
+        self.processes = max(1, min(processes or os.cpu_count() or 1, len(self.entries) or 1))
+        self.timeout = timeout
+        self.ring_capacity = ring_capacity
+        self.callback = callback
+        self.logger = logger
+        self.buffer = ColumnarRingBuffer(capacity)
+        self.instruments = [(entry.type, (entry.host, entry.port), entry.name) for entry in self.entries]
+        self.stats = {}
+        self.shards = []
+        self.stop_event = None
+        self.stopping = None
+
+    def start(self):
+        # spawn: GUI'nin iş parçacıkları fork ile kopyalanmasın
+        context = multiprocessing.get_context("spawn")
+        self.stop_event = context.Event()
+        for shard in range(self.processes):
+            ring = SharedRingBuffer(self.ring_capacity)
+            process = context.Process(
+                target=run_worker,
+                args=(self.entries[shard::self.processes], self.queries, self.rates, self.timeout,
+                      ring.name, self.ring_capacity, self.stop_event),
+                name=f"scpi-shard-{shard}", daemon=True)
+            process.start()
+            self.shards.append((ring, process))
+        self.stopping = None
+
+    async def run(self, interval=0.05):
+        self.start()
+        try:
+            while True:
+                self.drain()
+                await asyncio.sleep(interval)
+        finally:
+            await self.stop_async()
+
+    def drain(self):
+        total = 0
+        for shard, (ring, process) in enumerate(self.shards):
+            rows = ring.drain()
+            self.stats[f"shard{shard}"] = {**ring.stats(), "alive": process.is_alive()}
+            if not rows:
+                continue
+            # Yerel kimlik i, shard'ın girdi dilimindeki sıradır: genel kimlik shard + i * processes
+            rows = [(timestamp, shard + local * self.processes, query, value, latency)
+                    for timestamp, local, query, value, latency in rows]
+            self.buffer.extend(rows)
+            logger = self.logger
+            if logger:
+                for timestamp, instrument, query, value, latency in rows:
+                    entry = self.entries[instrument]
+                    logger.write(timestamp, entry.name, entry.port, self.queries[query], value, latency)
+            if self.callback:
+                self.callback(rows)
+            total += len(rows)
+        return total
+
+    async def stop_async(self, timeout=5):
+        # Olay döngüsünü bloklamadan durdurur; eşzamanlı çağrılar aynı kapanışı bekler
+        if self.stop_event is None:
+            return
+        if self.stopping is None:
+            self.stopping = asyncio.ensure_future(self._shutdown(timeout))
+        await asyncio.shield(self.stopping)
+
+    async def _shutdown(self, timeout):
+        loop = asyncio.get_running_loop()
+        self.stop_event.set()
+        deadline = loop.time() + timeout
+        while any(process.is_alive() for _, process in self.shards) and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        for _, process in self.shards:
+            if process.is_alive():
+                process.terminate()
+        deadline = loop.time() + 1
+        while any(process.is_alive() for _, process in self.shards):
+            if loop.time() >= deadline:
+                for _, process in self.shards:
+                    if process.is_alive():
+                        process.kill()
+            await asyncio.sleep(0.01)
+        self._release()
+
+    def stop(self):
+        # Olay döngüsü dışından (senkron) kullanım için
+        if self.stop_event is None:
+            return
+        self.stop_event.set()
+        for ring, process in self.shards:
+            process.join(5)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._release()
+
+    def _release(self):
+        for _, process in self.shards:
+            # Çıkmış süreç hemen toplanır
+            process.join()
+        self.drain()
+        for ring, _ in self.shards:
+            ring.close()
+            ring.unlink()
+        self.shards = []
+        self.stop_event = None
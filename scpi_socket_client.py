@@ -0,0 +1,123 @@
+import socket
+import time
+
+from async_scpi_client import configure_socket
+from scpi_client_base import NO_RESPONSE_EXPECTED, SCPIClientBase
+from scpi_commands import is_query, pipeline
+from scpi_framing import RECV_SIZE, FramingError, decode_frame
+
+
+class SCPISocketClient(SCPIClientBase):
+    def __init__(self, name, host, port):
+        super().__init__(name, host, port)
+        self.connection = None
+
+    def connect(self, timeout=5):
+        try:
+            self.connection = socket.create_connection((self.host, self.port), timeout=timeout)
+        except Exception as e:
+            raise ConnectionError(f"Connection to {self.host}:{self.port} failed: {e}")
+        configure_socket(self.connection)
+        self.reset_session()
+
+    def disconnect(self):
+        self.resync = False
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+
+    def drop(self):
+        # Bağlantı sıradaki komutta reopen ile yenilenir
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+        self.resync = True
+
+    def reopen(self, timeout):
+        if self.connection:
+            return
+        if not self.resync:
+            raise self.not_connected()
+        self.connect(timeout)
+        self.metrics.reconnect()
+
+    def send_command(self, command, expect_response=True, timeout=5):
+        if not self.connection and not self.resync:
+            raise self.not_connected()
+        response = self.cached(command, expect_response)
+        if response is not None:
+            return response
+        self.reopen(timeout)
+        started = time.perf_counter()
+        sent = time.time_ns()
+        pending = 0
+        try:
+            data = (command + '\n').encode('ascii')
+            self.connection.sendall(data)
+            self.metrics.sent(len(data))
+            if not expect_response:
+                self.metrics.record(1)
+                self.answered(command, sent, None)
+                return NO_RESPONSE_EXPECTED
+            pending = 1
+            response = decode_frame(self.read_frame(timeout))
+            pending = 0
+            if not response:
+                raise TimeoutError("No response from the device.")
+            self.metrics.record(1, time.perf_counter() - started)
+            self.answered(command, sent, response)
+            return response
+        except Exception as e:
+            raise self.failure(e, [command], sent, pending, "command")
+
+    def send_batch(self, commands, timeout=5, join=True):
+        self.reopen(timeout)
+        started = time.perf_counter()
+        sent = time.time_ns()
+        pending = 0
+        self.invalidate(commands)
+        responses = []
+        try:
+            data = pipeline(commands, join)
+            self.connection.sendall(data)
+            self.metrics.sent(len(data))
+            # Sorgu yanıtları gönderim sırasıyla gelir
+            queries = [is_query(command) for command in commands]
+            pending = sum(queries)
+            for command, query in zip(commands, queries):
+                response = None
+                if query:
+                    response = decode_frame(self.read_frame(timeout))
+                    pending -= 1
+                self.answered(command, sent, response)
+                responses.append(NO_RESPONSE_EXPECTED if response is None else response)
+            self.metrics.record(len(commands), time.perf_counter() - started)
+            return responses
+        except Exception as e:
+            # Yanıtı gelmeyen sorgular send_command'daki gibi başarısız olarak yakalanır
+            unanswered = [command for command in commands[len(responses):] if is_query(command)]
+            raise self.failure(e, unanswered, sent, pending, "batch")
+
+    def receive(self, chunk):
+        self.buffer.feed(chunk)
+
+    def read_frame(self, timeout=5):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                frame = self.buffer.next_frame()
+            except FramingError:
+                # Senkronizasyon kayboldu; bağlantı kapatılır, sıradaki komut yeniden bağlanır
+                self.drop()
+                raise
+            if frame is not None:
+                return frame
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise socket.timeout()
+            self.connection.settimeout(remaining)
+            chunk = self.connection.recv(max(RECV_SIZE, self.buffer.pending()))
+            if not chunk:
+                raise ConnectionError(f"Connection to {self.host}:{self.port} closed by the device.")
+            self.receive(chunk)
+            self.metrics.received(len(chunk))
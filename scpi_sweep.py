@@ -0,0 +1,169 @@
+import asyncio
+import inspect
+import math
+import time
+from array import array
+from collections import namedtuple
+
+from scpi_commands import is_query, load_numpy
+from scpi_polling import parse_float
+
+# setpoints: uygulanan noktalar, times: her noktanın gönderim zamanı (epoch s),
+# readings: {sorgu: dizi} (başarısız okumalar NaN), lateness: çizelgeden en büyük sapma (s),
+# errors: [(nokta indeksi, istisna)]
+SweepResult = namedtuple("SweepResult", ["setpoints", "times", "readings", "lateness", "errors"])
+
+
+def float_array(values):
+    np = load_numpy()
+    if np is not None:
+        return np.asarray(values, dtype=float)
+    return array("d", values)
+
+
+def nan_array(count):
+    np = load_numpy()
+    if np is not None:
+        return np.full(count, math.nan)
+    return array("d", [math.nan]) * count
+
+
+def linear_points(start, stop, count):
+    if count < 2:
+        return float_array([start] * count)
+    np = load_numpy()
+    if np is not None:
+        return np.linspace(start, stop, count)
+    step = (stop - start) / (count - 1)
+    return array("d", (start + index * step for index in range(count - 1))) + array("d", [stop])
+
+
+def step_points(start, stop, step):
+    # stop dahil; adımın işareti yöne göre düzeltilir
+    if not step:
+        raise ValueError("Step must be non-zero.")
+    count = int(math.floor(abs(stop - start) / abs(step) + 1e-9)) + 1
+    step = math.copysign(step, stop - start)
+    values = [start + index * step for index in range(count)]
+    if abs(values[-1] - stop) <= 1e-9 * abs(step):
+        values[-1] = stop
+    else:
+        values.append(stop)
+    return float_array(values)
+
+
+def ramp_points(start, stop, slew, interval):
+    # slew birim/s hızla, interval aralıklarla ilerleyen rampa
+    if slew <= 0 or interval <= 0:
+        raise ValueError("Slew rate and interval must be positive.")
+    count = int(math.ceil(abs(stop - start) / (slew * interval))) + 1
+    return linear_points(start, stop, max(count, 2))
+
+
+def format_points(points):
+    # repr(float) en kısa geri dönüşümlü gösterimdir; hassasiyet kaybı olmaz
+    return ",".join(map(repr, map(float, points)))
+
+
+class Sweep:
+    # Her nokta için ayar komutu ve geri okuma sorguları tek yazımda gönderilir. dwell > 0
+    # ise noktalar mutlak zaman çizelgesiyle ilerler (kayma birikmez, geciken nokta atlanmaz);
+    # dwell = 0 ise chunk noktalık gruplar boru hattıyla art arda gönderilir
+    def __init__(self, client, quantity, points, dwell=0.0, readback=(), timeout=5, chunk=64):
+        self.client = client
+        self.quantity = quantity
+        self.points = float_array(points)
+        self.dwell = dwell
+        self.readback = list(readback)
+        self.timeout = timeout
+        self.chunk = 1 if dwell else max(1, chunk)
+        self.is_async = inspect.iscoroutinefunction(client.send_command)
+        for query in self.readback:
+            if not is_query(query):
+                raise ValueError(f"Readback command must be a query: {query}")
+
+    def __len__(self):
+        return len(self.points)
+
+    def commands(self, start, stop):
+        commands = []
+        for value in self.points[start:stop]:
+            commands.append(f"{self.quantity} {float(value)!r}")
+            commands.extend(self.readback)
+        return commands
+
+    def store(self, result, start, stop, sent, responses):
+        # Yanıtlar komutlarla hizalıdır: nokta başına ayar komutu + geri okumalar
+        width = len(self.readback) + 1
+        for index in range(start, stop):
+            result.times[index] = sent
+            offset = (index - start) * width + 1
+            for query, response in zip(self.readback, responses[offset:offset + width - 1]):
+                result.readings[query][index] = parse_float(response)
+
+    def new_result(self):
+        count = len(self.points)
+        return SweepResult(self.points, nan_array(count), {query: nan_array(count) for query in self.readback},
+                           0.0, [])
+
+    def run(self, start=None):
+        # start: ortak çizelge başlangıcı (async: loop.time(), senkron: time.monotonic())
+        if self.is_async:
+            return self._run_async(start)
+        return self._run_sync(start)
+
+    async def _run_async(self, start=None):
+        loop = asyncio.get_running_loop()
+        start = loop.time() if start is None else start
+        result = self.new_result()
+        lateness = 0.0
+        for first in range(0, len(self.points), self.chunk):
+            last = min(first + self.chunk, len(self.points))
+            if self.dwell:
+                delay = start + first * self.dwell - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    lateness = max(lateness, -delay)
+            sent = time.time()
+            try:
+                responses = await self.client.send_batch(self.commands(first, last), self.timeout)
+            except Exception as e:
+                result.errors.append((first, e))
+                if isinstance(e, ConnectionError):
+                    break
+                continue
+            self.store(result, first, last, sent, responses)
+        return result._replace(lateness=lateness)
+
+    def _run_sync(self, start=None):
+        start = time.monotonic() if start is None else start
+        result = self.new_result()
+        lateness = 0.0
+        for first in range(0, len(self.points), self.chunk):
+            last = min(first + self.chunk, len(self.points))
+            if self.dwell:
+                delay = start + first * self.dwell - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    lateness = max(lateness, -delay)
+            sent = time.time()
+            try:
+                responses = self.client.send_batch(self.commands(first, last), self.timeout)
+            except Exception as e:
+                result.errors.append((first, e))
+                if isinstance(e, ConnectionError):
+                    break
+                continue
+            self.store(result, first, last, sent, responses)
+        return result._replace(lateness=lateness)
+
+
+async def run_sweeps(sweeps, lead=0.01):
+    # sweeps: {anahtar: Sweep}; tüm cihazlar aynı çizelgeyi paylaşır, i. nokta hepsinde
+    # start + i * dwell anında gönderilir. Kaynaklar ve yükler aynı sözlükte olabilir
+    start = asyncio.get_running_loop().time() + lead
+    keys = list(sweeps)
+    results = await asyncio.gather(*(sweeps[key].run(start) for key in keys), return_exceptions=True)
+    return dict(zip(keys, results))
@@ -0,0 +1,139 @@
+from async_scpi_client import AsyncSCPIClient
+from scpi_socket_client import SCPISocketClient
+
+IAC = 255
+DONT = 254
+DO = 253
+WONT = 252
+WILL = 251
+SB = 250
+SE = 240
+SGA = 3
+TTYPE = 24
+IAC_BYTE = b"\xff"
+# Kabul edilen tek seçenek "suppress go ahead"; diğer her istek reddedilir
+ACCEPTED_OPTIONS = frozenset((SGA,))
+
+
+class TelnetFilter:
+    # Minimal RFC 854/1143 işleme: veri akışından IAC dizileri ayıklanır, seçenek
+    # istekleri yanıtlanır, alt görüşmeler (SB ... IAC SE) atlanır. IAC içermeyen
+    # parçalar kopyalanmadan geçer. Gönderilen komutlar ASCII olduğundan 0xFF
+    # kaçışı gerekmez.
+    def __init__(self):
+        self.state = None
+        self.local = set()
+        self.remote = set()
+
+    def reset(self):
+        self.state = None
+        self.local.clear()
+        self.remote.clear()
+
+    def offer(self, option):
+        self.local.add(option)
+        return bytes((IAC, WILL, option))
+
+    def request(self, option):
+        return bytes((IAC, DO, option))
+
+    def feed(self, chunk):
+        if self.state is None and IAC_BYTE not in chunk:
+            return chunk, b""
+        data = bytearray()
+        replies = bytearray()
+        index = 0
+        size = len(chunk)
+        while index < size:
+            state = self.state
+            if state is None:
+                end = chunk.find(IAC_BYTE, index)
+                if end < 0:
+                    data += chunk[index:]
+                    break
+                data += chunk[index:end]
+                self.state = IAC
+                index = end + 1
+                continue
+            byte = chunk[index]
+            index += 1
+            if state == IAC:
+                if byte == IAC:
+                    data.append(IAC)
+                    self.state = None
+                elif byte in (DO, DONT, WILL, WONT):
+                    self.state = byte
+                elif byte == SB:
+                    self.state = SB
+                else:
+                    # NOP, GA, AYT vb. tek baytlık komutlar yok sayılır
+                    self.state = None
+            elif state == SB:
+                if byte == IAC:
+                    self.state = SE
+            elif state == SE:
+                self.state = None if byte == SE else SB
+            else:
+                self.state = None
+                replies += self.negotiate(state, byte)
+        return bytes(data), bytes(replies)
+
+    def negotiate(self, command, option):
+        # Yalnızca durum değiştiğinde yanıt verilir; böylece karşılıklı onay döngüsü oluşmaz
+        if command == DO:
+            if option in self.local:
+                return b""
+            if option in ACCEPTED_OPTIONS:
+                self.local.add(option)
+                return bytes((IAC, WILL, option))
+            return bytes((IAC, WONT, option))
+        if command == WILL:
+            if option in self.remote:
+                return b""
+            if option in ACCEPTED_OPTIONS:
+                self.remote.add(option)
+                return bytes((IAC, DO, option))
+            return bytes((IAC, DONT, option))
+        if command == DONT and option in self.local:
+            self.local.discard(option)
+            return bytes((IAC, WONT, option))
+        if command == WONT and option in self.remote:
+            self.remote.discard(option)
+            return bytes((IAC, DONT, option))
+        return b""
+
+
+class SCPITelnetClient(SCPISocketClient):
+    # telnetlib yerine ham soket + TelnetFilter; çerçeveleme ve zaman aşımları SCPISocketClient ile aynı
+    def __init__(self, host, port, name=None):
+        super().__init__(name or f"telnet-{port}", host, port)
+        self.telnet = TelnetFilter()
+
+    def reset_session(self):
+        # Yeniden bağlanmada (reopen dahil) seçenek durumu sıfırdan başlar
+        super().reset_session()
+        self.telnet.reset()
+
+    def receive(self, chunk):
+        data, replies = self.telnet.feed(chunk)
+        if replies:
+            self.connection.sendall(replies)
+        if data:
+            self.buffer.feed(data)
+
+
+class AsyncSCPITelnetClient(AsyncSCPIClient):
+    def __init__(self, host, port, name=None):
+        super().__init__(name or f"telnet-{port}", host, port)
+        self.telnet = TelnetFilter()
+
+    def reset_session(self):
+        super().reset_session()
+        self.telnet.reset()
+
+    def receive(self, chunk):
+        data, replies = self.telnet.feed(chunk)
+        if replies:
+            self.writer.write(replies)
+        if data:
+            self.buffer.feed(data)
@@ -0,0 +1,108 @@
+import tkinter as tk
+from collections import deque
+from tkinter import ttk
+
+MAX_RESPONSE_LINES = 1000
+
+
+class ResponseView:
+    # Son max_lines satırı tutan halka; satırlar append ile biriktirilir ve flush
+    # ile tek bir insert/delete çiftiyle çizilir (satır başına widget çağrısı yok)
+    def __init__(self, parent, max_lines=MAX_RESPONSE_LINES, **options):
+        self.text = tk.Text(parent, **options)
+        self.lines = deque(maxlen=max_lines)
+        self.pending = []
+        self.shown = 0
+
+    def grid(self, **options):
+        self.text.grid(**options)
+
+    def append(self, line):
+        self.pending.append(line)
+
+    def flush(self):
+        if not self.pending:
+            return
+        pending = self.pending
+        self.pending = []
+        self.lines.extend(pending)
+        at_end = self.text.yview()[1] >= 1.0
+        if len(pending) >= self.lines.maxlen:
+            # Halka tamamen yenilendi; eski içeriği silip baştan çiz
+            self.text.delete("1.0", tk.END)
+            self.text.insert(tk.END, "\n".join(self.lines) + "\n")
+            self.shown = len(self.lines)
+        else:
+            self.text.insert(tk.END, "\n".join(pending) + "\n")
+            self.shown += len(pending)
+            excess = self.shown - self.lines.maxlen
+            if excess > 0:
+                self.text.delete("1.0", f"{excess + 1}.0")
+                self.shown -= excess
+        if at_end:
+            self.text.see(tk.END)
+
+    def get(self):
+        self.flush()
+        return "\n".join(self.lines)
+
+    def clear(self):
+        self.lines.clear()
+        self.pending = []
+        self.shown = 0
+        self.text.delete("1.0", tk.END)
+
+
+class StatusTable:
+    # Cihaz başına tek satır; güncellemeler birleştirilir, flush yalnızca değişen
+    # satırlara dokunur
+    COLUMNS = (
+        ("name", "Instrument", 120),
+        ("address", "Address", 130),
+        ("state", "State", 90),
+        ("command", "Last Command", 120),
+        ("response", "Last Response", 160),
+        ("p99", "p99 (ms)", 70),
+        ("errors", "Errors", 60),
+    )
+
+    def __init__(self, parent, height=8):
+        self.tree = ttk.Treeview(parent, columns=[name for name, _, _ in self.COLUMNS], show="headings", height=height)
+        for name, heading, width in self.COLUMNS:
+            self.tree.heading(name, text=heading)
+            self.tree.column(name, width=width, stretch=name == "response")
+        self.rows = {}
+        self.dirty = {}
+
+    def grid(self, **options):
+        self.tree.grid(**options)
+
+    def update(self, client, **fields):
+        key = f"{client.host}:{client.port}"
+        row = self.rows.get(key)
+        if row is None:
+            row = self.rows[key] = {"name": getattr(client, "name", key), "address": key, "state": "", "command": "",
+                                    "response": "", "p99": "", "errors": ""}
+        row.update(fields)
+        self.dirty[key] = client
+
+    def flush(self):
+        dirty = self.dirty
+        self.dirty = {}
+        for key, client in dirty.items():
+            row = self.rows[key]
+            metrics = getattr(client, "metrics", None)
+            if metrics is not None:
+                p99 = metrics.latency.percentile(99)
+                row["p99"] = f"{p99 * 1000:.2f}" if p99 is not None else ""
+                row["errors"] = metrics.errors + metrics.timeouts
+            values = [row[name] for name, _, _ in self.COLUMNS]
+            if self.tree.exists(key):
+                self.tree.item(key, values=values)
+            else:
+                self.tree.insert("", tk.END, iid=key, values=values)
+
+    def clear(self):
+        self.rows.clear()
+        self.dirty.clear()
+        self.tree.delete(*self.tree.get_children())
@@ -1,40 +1,22 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import telnetlib
-import threading
-
-class SCPITelnetClient:
-    def __init__(self, host, port):
-        self.host = host
-        self.port = port
-        self.connection = None
-
-    def connect(self):
-        try:
-            self.connection = telnetlib.Telnet(self.host, self.port)
-        except Exception as e:
-            raise ConnectionError(f"Connection to {self.host}:{self.port} failed: {e}")
-
-    def disconnect(self):
-        if self.connection:
-            self.connection.close()
-            self.connection = None
-
-    def send_command(self, command):
-        if not self.connection:
-            raise ConnectionError(f"Not connected to {self.host}:{self.port}.")
-        self.connection.write(command.encode('ascii') + b'\n')
-        return self.connection.read_until(b'\n').decode('ascii').strip()
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from scpi_telnet_client import SCPITelnetClient
+from scpi_views import ResponseView, StatusTable
 
 class SCPIApp:
     def __init__(self, root):
         self.root = root
         self.root.title("SCPI Telnet Client - Multiport")
         self.clients = {}
-        self.responses = {}
+        # Cihaz başına tek iş parçacığı: komutlar sırayla gider, ana iş parçacığı beklemez
+        self.workers = {}
+        self.response_queue = queue.Queue()
 
         self.create_widgets()
         self.create_layout()
+        self.root.after(50, self.process_responses)
 
     def create_widgets(self):
         self.ip_label = tk.Label(self.root, text="IP:")
@@ -50,7 +32,8 @@ class SCPIApp:
         self.command_listbox.insert(tk.END, "MEAS:VOLT?")
         self.send_button = tk.Button(self.root, text="Send Command", command=self.send_command)
 
-        self.response_text = tk.Text(self.root, height=10, width=50)
+        self.response_view = ResponseView(self.root, height=10, width=50)
+        self.status_table = StatusTable(self.root)
         self.save_button = tk.Button(self.root, text="Save Responses", command=self.save_responses)
 
     def create_layout(self):
@@ -65,8 +48,9 @@ class SCPIApp:
         self.command_listbox.grid(row=2, column=0, columnspan=3, sticky=tk.EW)
         self.send_button.grid(row=3, column=0, columnspan=3, sticky=tk.EW)
 
-        self.response_text.grid(row=4, column=0, columnspan=3, sticky=tk.EW)
+        self.response_view.grid(row=4, column=0, columnspan=3, sticky=tk.EW)
         self.save_button.grid(row=5, column=0, columnspan=3, sticky=tk.EW)
+        self.status_table.grid(row=6, column=0, columnspan=3, sticky=tk.NSEW)
 
     def connect(self):
         ip = self.ip_entry.get()
@@ -80,14 +64,18 @@ class SCPIApp:
                 client = SCPITelnetClient(ip, port)
                 client.connect()
                 self.clients[port] = client
+                self.workers[port] = ThreadPoolExecutor(max_workers=1)
+                self.status_table.update(client, state="connected")
                 messagebox.showinfo("Info", f"Connected to {ip}:{port} successfully.")
             except Exception as e:
                 messagebox.showerror("Error", str(e))
 
     def disconnect(self):
         for port, client in self.clients.items():
+            self.workers.pop(port).shutdown(wait=False)
             client.disconnect()
         self.clients.clear()
+        self.status_table.clear()
         messagebox.showinfo("Info", "Disconnected all connections successfully.")
 
     def send_command(self):
@@ -96,29 +84,32 @@ class SCPIApp:
             messagebox.showerror("Error", "No command selected.")
             return
 
-        self.responses.clear()
-        threads = []
-
         for port, client in self.clients.items():
-            thread = threading.Thread(target=self.send_command_to_client, args=(client, command, port))
-            threads.append(thread)
-            thread.start()
-
-        for thread in threads:
-            thread.join()
-
-        for port, response in self.responses.items():
-            self.response_text.insert(tk.END, f"{port}: {command} -> {response}\n")
+            self.workers[port].submit(self.send_command_to_client, client, command, port)
 
     def send_command_to_client(self, client, command, port):
         try:
             response = client.send_command(command)
-            self.responses[port] = response
         except Exception as e:
-            self.responses[port] = str(e)
+            response = str(e)
+        self.response_queue.put((port, client, command, response))
+
+    def process_responses(self):
+        while True:
+            try:
+                port, client, command, response = self.response_queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(response, memoryview):
+                response = f"<{len(response)} byte block>"
+            self.response_view.append(f"{port}: {command} -> {response}")
+            self.status_table.update(client, command=command, response=response)
+        self.response_view.flush()
+        self.status_table.flush()
+        self.root.after(50, self.process_responses)
 
     def save_responses(self):
-        responses = self.response_text.get(1.0, tk.END)
+        responses = self.response_view.get()
         if not responses.strip():
             messagebox.showwarning("Warning", "No responses to save.")
             return
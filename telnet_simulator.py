@@ -1,38 +1,94 @@
+import logging
 import socket
 import threading
 
+from scpi_commands import is_query, split_commands
+from scpi_parser import CommandTree, SCPIError
+from scpi_telnet_client import SGA, TTYPE, TelnetFilter
+
+logger = logging.getLogger("telnet_simulator")
+
+TELNET_COMMANDS = CommandTree([
+    ("*IDN", None, "identify"),
+    ("MEASure[:SCALar]:VOLTage[:DC]", None, "measure_voltage"),
+])
+
 class SCPITelnetSimulator:
     def __init__(self, host='127.0.0.1', port=5025):
         self.host = host
         self.port = port
-        self.commands = {
-            "*IDN?": "Simulated Instrument, Model 1234, Serial 5678, Firmware 1.0",
-            "MEAS:VOLT?": "3.3"
-        }
+        self.idn = "Simulated Instrument, Model 1234, Serial 5678, Firmware 1.0"
+        self.voltage = "3.3"
         self.server = None
 
     def start(self):
         self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server.bind((self.host, self.port))
         self.server.listen(5)
-        print(f"Simulated SCPI server started on {self.host}:{self.port}")
+        logger.info("Simulated SCPI server started on %s:%s", self.host, self.port)
 
         while True:
             client_socket, addr = self.server.accept()
-            print(f"Connection from {addr}")
+            logger.info("Connection from %s", addr)
             client_handler = threading.Thread(target=self.handle_client, args=(client_socket,))
             client_handler.start()
 
+    def handle_line(self, line):
+        responses = []
+        for command in split_commands(line):
+            if not is_query(command):
+                continue
+            try:
+                responses.append(TELNET_COMMANDS.dispatch(self, command))
+            except SCPIError:
+                responses.append("ERROR: Unknown command")
+        return ";".join(responses) if responses else None
+
+    def identify(self, args, suffixes):
+        return self.idn
+
+    def measure_voltage(self, args, suffixes):
+        return self.voltage
+
     def handle_client(self, client_socket):
+        buffer = bytearray()
+        telnet = TelnetFilter()
+        debug = logger.isEnabledFor(logging.DEBUG)
         with client_socket as sock:
+            # Gerçek telnet sunucuları gibi bağlantıda seçenek görüşmesi başlatılır
+            sock.sendall(telnet.offer(SGA) + telnet.request(TTYPE))
             while True:
                 try:
-                    data = sock.recv(1024).decode('ascii').strip()
+                    data = sock.recv(65536)
                     if not data:
                         break
-                    print(f"Received command: {data}")
-                    response = self.commands.get(data, "ERROR: Unknown command")
-                    sock.sendall((response + '\n').encode('ascii'))
+                    data, replies = telnet.feed(data)
+                    if replies:
+                        sock.sendall(replies)
+                    buffer += data
+                    end = buffer.rfind(b'\n')
+                    if end < 0:
+                        continue
+                    lines = buffer[:end].split(b'\n')
+                    del buffer[:end + 1]
+
+                    responses = []
+                    for line in lines:
+                        try:
+                            line = line.decode('ascii').strip()
+                        except UnicodeDecodeError:
+                            # ASCII olmayan satır yanıtlanmaz; bağlantı ve iş parçacığı sürer
+                            logger.warning("Discarding non-ASCII command: %r", bytes(line))
+                            continue
+                        if not line:
+                            continue
+                        if debug:
+                            logger.debug("Received command: %s", line)
+                        response = self.handle_line(line)
+                        if response is not None:
+                            responses.append(response)
+                    if responses:
+                        sock.sendall(('\n'.join(responses) + '\n').encode('ascii'))
                 except ConnectionResetError:
                     break
 
@@ -40,9 +96,10 @@ class SCPITelnetSimulator:
         if self.server:
             self.server.close()
             self.server = None
-            print("Simulated SCPI server stopped")
+            logger.info("Simulated SCPI server stopped")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
     simulator = SCPITelnetSimulator()
     try:
         simulator.start()
@@ -0,0 +1,13 @@
+from async_load_simulator import VirtualInstrument
+
+
+def test_set_commands_do_not_reply():
+    instrument = VirtualInstrument(5025)
+    for command in ("SET:VAL 5", "VOLT 5", "CURR 2", "OUTP ON", "*RST", "SYST:REM"):
+        assert instrument.handle_line(command) is None, command
+
+
+def test_compound_message_replies_once():
+    instrument = VirtualInstrument(5025)
+    assert instrument.handle_line("SET:VAL 5;VOLT 3;:VOLT?") == "3"
+    assert instrument.handle_line("VOLT?;CURR?") == "3;12"
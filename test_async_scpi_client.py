@@ -0,0 +1,215 @@
+import asyncio
+import threading
+
+from async_scpi_client import AsyncSCPIClient
+from scpi_capture import FAILED, NO_RESPONSE, TEXT, CaptureReader, CaptureWriter
+from scpi_commands import SCPICommands
+from scpi_socket_client import SCPISocketClient
+
+
+async def start_server(delays, received=None, silent=()):
+    # Her sorguya "<komut> yanıtı" döner; delays komut başına yanıt gecikmesi, silent
+    # içindeki sorgular hiç yanıtlanmaz (bilinmeyen sorgu gibi)
+    async def handle(reader, writer):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode().strip()
+            if received is not None:
+                received.append(command)
+            if command.endswith("?") and command not in silent:
+                await asyncio.sleep(delays.get(command, 0))
+                writer.write(f"{command} reply\n".encode())
+                await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+async def stop_server(server):
+    server.close()
+    await server.wait_closed()
+    # Gecikmeli yanıt bekleyen bağlantı işleyicileri de döngü durmadan bitirilir
+    handlers = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in handlers:
+        task.cancel()
+    await asyncio.gather(*handlers, return_exceptions=True)
+
+
+def test_late_reply_is_not_returned_for_next_query():
+    async def main():
+        server = await start_server({"VOLT?": 0.3})
+        port = server.sockets[0].getsockname()[1]
+        client = AsyncSCPIClient("test", "127.0.0.1", port)
+        await client.connect()
+        try:
+            try:
+                await client.send_command("VOLT?", True, 0.1)
+            except TimeoutError:
+                pass
+            else:
+                raise AssertionError("VOLT? should have timed out")
+            assert await client.send_command("CURR?") == "CURR? reply"
+            assert await client.send_command("POW?") == "POW? reply"
+        finally:
+            await client.disconnect()
+            server.close()
+
+    asyncio.run(main())
+
+
+def test_late_batch_replies_are_discarded():
+    async def main():
+        server = await start_server({"B?": 0.3})
+        port = server.sockets[0].getsockname()[1]
+        client = AsyncSCPIClient("test", "127.0.0.1", port)
+        await client.connect()
+        try:
+            try:
+                await client.send_batch(["A?", "B?", "C?"], 0.1)
+            except TimeoutError:
+                pass
+            else:
+                raise AssertionError("batch should have timed out")
+            assert client.resync
+            assert await client.send_batch(["D?", "E?"]) == ["D? reply", "E? reply"]
+            assert client.connected
+        finally:
+            await client.disconnect()
+            server.close()
+
+    asyncio.run(main())
+
+
+def test_unanswered_query_does_not_wedge_the_connection():
+    async def main():
+        server = await start_server({}, silent={"BAD?"})
+        port = server.sockets[0].getsockname()[1]
+        client = AsyncSCPIClient("test", "127.0.0.1", port)
+        await client.connect()
+        try:
+            for _ in range(3):
+                try:
+                    await client.send_command("BAD?", True, 0.1)
+                except TimeoutError:
+                    pass
+                else:
+                    raise AssertionError("BAD? should have timed out")
+                for command in ("A?", "B?", "C?"):
+                    assert await client.send_command(command, True, 0.5) == f"{command} reply"
+            try:
+                await client.send_batch(["D?", "BAD?", "E?"], 0.1)
+            except TimeoutError:
+                pass
+            else:
+                raise AssertionError("batch should have timed out")
+            assert await client.send_batch(["F?", "G?"], 0.5) == ["F? reply", "G? reply"]
+            assert client.metrics.reconnects == 4
+        finally:
+            await client.disconnect()
+            server.close()
+
+    asyncio.run(main())
+
+
+def test_timed_out_batch_captures_unanswered_queries_as_failed(tmp_path):
+    path = tmp_path / "batch.scpicap"
+
+    async def main(capture):
+        server = await start_server({"B?": 0.3})
+        port = server.sockets[0].getsockname()[1]
+        client = AsyncSCPIClient("test", "127.0.0.1", port)
+        client.capture = capture
+        await client.connect()
+        try:
+            try:
+                await client.send_batch(["A?", "VOLT 1", "B?", "CURR 2", "C?"], 0.1)
+            except TimeoutError:
+                pass
+            else:
+                raise AssertionError("batch should have timed out")
+        finally:
+            await client.disconnect()
+            server.close()
+
+    with CaptureWriter(str(path)) as capture:
+        asyncio.run(main(capture))
+    with CaptureReader(str(path)) as reader:
+        recorded = [(exchange.command, exchange.kind) for exchange in reader]
+    assert recorded == [("A?", TEXT), ("VOLT 1", NO_RESPONSE), ("B?", FAILED), ("C?", FAILED)]
+
+
+def test_identity_is_cached_per_client_until_reset():
+    async def main():
+        received = []
+        server = await start_server({}, received)
+        port = server.sockets[0].getsockname()[1]
+        client = AsyncSCPIClient("test", "127.0.0.1", port)
+        await client.connect()
+        try:
+            assert await SCPICommands(client).identify() == "*IDN? reply"
+            assert await SCPICommands(client).identify() == "*IDN? reply"
+            assert await client.send_command("*idn?") == "*IDN? reply"
+            assert received.count("*IDN?") == 1
+            await client.send_command("OUTP OFF;*RST", False)
+            await client.send_command("*IDN?")
+            assert received.count("*IDN?") == 2
+            await client.send_batch(["*RST", "VOLT?"])
+            await client.send_command("*IDN?")
+            assert received.count("*IDN?") == 3
+        finally:
+            await client.disconnect()
+            server.close()
+
+    asyncio.run(main())
+
+
+def test_socket_client_discards_late_reply():
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(start_server({"VOLT?": 0.3}))
+    port = server.sockets[0].getsockname()[1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    client = SCPISocketClient("test", "127.0.0.1", port)
+    client.connect()
+    try:
+        try:
+            client.send_command("VOLT?", True, 0.1)
+        except TimeoutError:
+            pass
+        else:
+            raise AssertionError("VOLT? should have timed out")
+        assert client.send_command("CURR?") == "CURR? reply"
+    finally:
+        client.disconnect()
+        asyncio.run_coroutine_threadsafe(stop_server(server), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def test_socket_client_recovers_from_unanswered_query():
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(start_server({}, silent={"BAD?"}))
+    port = server.sockets[0].getsockname()[1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    client = SCPISocketClient("test", "127.0.0.1", port)
+    client.connect()
+    try:
+        for _ in range(3):
+            try:
+                client.send_command("BAD?", True, 0.1)
+            except TimeoutError:
+                pass
+            else:
+                raise AssertionError("BAD? should have timed out")
+            assert client.send_command("CURR?", True, 0.5) == "CURR? reply"
+            assert client.send_batch(["A?", "B?"], 0.5) == ["A? reply", "B? reply"]
+    finally:
+        client.disconnect()
+        asyncio.run_coroutine_threadsafe(stop_server(server), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
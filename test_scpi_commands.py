@@ -0,0 +1,59 @@
+from decimal import Decimal
+
+from scpi_commands import Identity, SCPICommands, is_query, join_commands, pipeline, split_commands
+
+
+def test_is_query_compound_messages():
+    assert is_query("*IDN?")
+    assert is_query(":SYST:ERR? ")
+    assert is_query("VOLT 5;CURR?")
+    assert is_query("VOLT?;:CURR 2")
+    assert not is_query("VOLT 5")
+    assert not is_query("VOLT 5;:CURR 2")
+    assert not is_query('DISP:TEXT "ready?"')
+    assert not is_query("")
+
+
+def test_split_commands_inverts_join_commands():
+    commands = ["VOLT 1", ":CURR 2", "*OPC?", ":OUTP ON"]
+    assert split_commands(join_commands(["VOLT 1", "CURR 2", "*OPC?", ":OUTP ON"])) == commands
+    assert split_commands('DISP:TEXT "a;b";*IDN?') == ['DISP:TEXT "a;b"', "*IDN?"]
+    assert split_commands("A 'x;y';B") == ["A 'x;y'", "B"]
+    assert split_commands("VOLT 1;") == ["VOLT 1"]
+    assert split_commands("") == []
+
+
+def test_pipeline_puts_each_query_on_its_own_line():
+    data = pipeline(["VOLT 1", "CURR 2", "VOLT 5;CURR?", "OUTP ON", "*IDN?"])
+    assert data == b"VOLT 1;:CURR 2\nVOLT 5;CURR?\nOUTP ON\n*IDN?\n"
+    assert pipeline(["VOLT 1", "CURR 2"], join=False) == b"VOLT 1\nCURR 2\n"
+
+
+class RecordingClient:
+    def __init__(self, responses=None):
+        self.sent = []
+        self.responses = responses or {}
+
+    def send_command(self, command, expect_response=True, timeout=5):
+        self.sent.append(command)
+
+    def send_batch(self, commands, timeout=5, join=True):
+        self.sent.extend(commands)
+        return [self.responses.get(command, "No response expected") for command in commands]
+
+
+def test_upload_list_formats_dwell_as_plain_number():
+    client = RecordingClient()
+    SCPICommands(client).upload_list("VOLT", [Decimal("1.5"), 2], Decimal("0.25"))
+    assert client.sent == ["LIST:VOLT 1.5,2.0;:LIST:DWEL 0.25"]
+
+
+def test_batch_applies_typed_parsers():
+    client = RecordingClient({"*IDN?": "ACME,LOAD,42,1.0", "FETC:VOLT?": "1.5", "OUTP?": "ON", "CURR?": "2"})
+    with SCPICommands(client).batch() as batch:
+        batch.identity()
+        batch.output_on()
+        batch.fetch("VOLT")
+        batch.query_bool("OUTP?")
+        batch.get_current()
+    assert batch.results == [Identity("ACME", "LOAD", "42", "1.0"), "No response expected", 1.5, True, "2"]
@@ -0,0 +1,64 @@
+import pytest
+
+from scpi_framing import FramingError, ResponseBuffer
+
+
+def test_malformed_block_header_raises_and_recovers():
+    buffer = ResponseBuffer()
+    buffer.feed(b"#1X123\n")
+    with pytest.raises(FramingError):
+        buffer.next_frame()
+    assert len(buffer) == 0
+    buffer.feed(b"5\n")
+    assert buffer.next_frame() == b"5"
+
+
+def test_block_length_must_be_digits():
+    buffer = ResponseBuffer()
+    buffer.feed(b"#2 5abcde")
+    with pytest.raises(ConnectionError):
+        buffer.next_frame()
+
+
+def frames(buffer):
+    result = []
+    while True:
+        frame = buffer.next_frame()
+        if frame is None:
+            return result
+        result.append(bytes(frame))
+
+
+def test_lines_and_blocks():
+    buffer = ResponseBuffer()
+    buffer.feed(b"1.5\n#15hello\r\n#0raw data\n2\n")
+    assert frames(buffer) == [b"1.5", b"hello", b"raw data", b"2"]
+    assert len(buffer) == 0
+
+
+def test_frames_split_across_feeds():
+    buffer = ResponseBuffer()
+    data = b"#212abcdefghijkl\nVOLT 5\n"
+    result = []
+    for index in range(len(data)):
+        buffer.feed(data[index:index + 1])
+        result += frames(buffer)
+    assert result == [b"abcdefghijkl", b"VOLT 5"]
+
+
+def test_block_may_contain_newlines():
+    buffer = ResponseBuffer()
+    buffer.feed(b"#14a\nb\n\nok\n")
+    assert frames(buffer) == [b"a\nb\n", b"ok"]
+
+
+def test_pending_counts_missing_block_bytes():
+    buffer = ResponseBuffer()
+    buffer.feed(b"#3100abc")
+    assert buffer.pending() == 97
+    assert buffer.next_frame() is None
+    buffer.feed(b"x" * 97)
+    assert buffer.pending() == 0
+    assert len(buffer.next_frame()) == 100
+    buffer.feed(b"#0abc")
+    assert buffer.pending() == 0
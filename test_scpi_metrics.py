@@ -0,0 +1,32 @@
+from scpi_metrics import BUCKETS, ConnectionMetrics, LatencyHistogram
+
+
+def test_every_bucket_is_reachable():
+    for index in range(BUCKETS):
+        micros = int(round(LatencyHistogram.bucket_value(index) * 1e6))
+        assert LatencyHistogram.bucket(micros) == index
+
+
+def test_bucket_precision():
+    for micros in range(1, 1 << 22, 97):
+        value = LatencyHistogram.bucket_value(LatencyHistogram.bucket(micros)) * 1e6
+        assert abs(value - micros) / micros <= 1 / 64
+
+
+def test_percentiles():
+    histogram = LatencyHistogram()
+    for millis in range(1, 101):
+        histogram.record(millis / 1000)
+    assert abs(histogram.percentile(50) - 0.050) < 0.050 / 32
+    assert abs(histogram.percentile(99) - 0.099) < 0.099 / 32
+    assert abs(histogram.percentile(100) - histogram.max) < histogram.max / 32
+
+
+def test_adaptive_timeout_bounds():
+    metrics = ConnectionMetrics("test", "127.0.0.1", 0)
+    assert metrics.adaptive_timeout(5) == 5
+    for _ in range(50):
+        metrics.record(1, 0.002)
+    assert metrics.adaptive_timeout(5) == 1.0
+    assert metrics.adaptive_timeout(5, minimum=0.001) < 0.01
+    assert metrics.adaptive_timeout(0.1) == 0.1
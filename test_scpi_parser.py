@@ -0,0 +1,33 @@
+import pytest
+
+from scpi_parser import CommandTree, SCPIError
+
+TREE = CommandTree([
+    ("[:SOURce]:VOLTage[:LEVel]", "set_volt", "get_volt"),
+    ("OUTPut#[:STATe]", "set_output", "get_output"),
+    ("MEASure:CURRent?", None, "measure_current"),
+    ("*IDN", None, "identify"),
+    ("*RST", "reset", None),
+])
+
+
+def test_long_short_and_optional_forms():
+    for header in ("VOLT", "volt", "VOLTAGE", ":SOUR:VOLT:LEV", "SOURCE:VOLTAGE", "VOLT:LEVEL"):
+        assert TREE.resolve(header) == ("set_volt", ()), header
+    assert TREE.resolve("SOUR:VOLT?") == ("get_volt", ())
+    assert TREE.resolve("MEAS:CURR?") == ("measure_current", ())
+    assert TREE.resolve("*idn?") == ("identify", ())
+    assert TREE.resolve("*RST") == ("reset", ())
+
+
+def test_numeric_suffixes():
+    assert TREE.resolve("OUTP") == ("set_output", (1,))
+    assert TREE.resolve("OUTP2:STAT?") == ("get_output", (2,))
+    assert TREE.resolve("OUTPUT12") == ("set_output", (12,))
+
+
+@pytest.mark.parametrize("header", ["VOLTA", "VOL", "SOUR:CURR", "VOLT2", "MEAS:CURR", "*RST?", "*TRG", "OUTP:X"])
+def test_undefined_header(header):
+    with pytest.raises(SCPIError) as error:
+        TREE.resolve(header)
+    assert error.value.code == -113
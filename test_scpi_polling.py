@@ -0,0 +1,43 @@
+import asyncio
+
+from scpi_polling import ColumnarRingBuffer, PollingScheduler
+
+
+class FakeClient:
+    def __init__(self, name, delay):
+        self.name = name
+        self.port = 0
+        self.delay = delay
+        self.polls = 0
+
+    async def send_batch(self, commands, timeout=5):
+        self.polls += 1
+        await asyncio.sleep(min(self.delay, timeout))
+        if self.delay >= timeout:
+            raise TimeoutError("Timeout waiting for response")
+        return ["1"] * len(commands)
+
+
+def test_slow_instrument_does_not_stall_group():
+    fast = FakeClient("fast", 0)
+    dead = FakeClient("dead", 10)
+    clients = {"loads": {"fast": fast, "dead": dead}}
+    scheduler = PollingScheduler(clients, ["VOLT?"], {"loads": 20}, timeout=1)
+
+    async def main():
+        task = asyncio.ensure_future(scheduler.run())
+        await asyncio.sleep(0.5)
+        task.cancel()
+
+    asyncio.run(main())
+    assert fast.polls >= 8
+    assert dead.polls == 1
+    assert scheduler.stats["loads"]["max_lateness"] < 0.05
+
+
+def test_ring_buffer_tail_wraps_in_order():
+    buffer = ColumnarRingBuffer(3)
+    buffer.extend([(index, 0, 0, index * 1.0, 0.0) for index in range(5)])
+    assert len(buffer) == 3
+    assert list(buffer.tail()["value"]) == [2.0, 3.0, 4.0]
+    assert list(buffer.tail(2)["timestamp"]) == [3.0, 4.0]
@@ -0,0 +1,87 @@
+import asyncio
+
+from scpi_metrics import ConnectionMetrics
+from scpi_pool import CircuitBreaker, ConnectionPool
+
+
+class FakeClient:
+    def __init__(self, delays):
+        self.host = "127.0.0.1"
+        self.port = 0
+        self.delays = delays
+        self.metrics = ConnectionMetrics("fake", self.host, self.port)
+        for _ in range(50):
+            self.metrics.record(1, 0.002)
+
+    async def send_command(self, command, expect_response=True, timeout=5):
+        delay = self.delays.get(command, 0)
+        await asyncio.sleep(min(delay, timeout))
+        if delay >= timeout:
+            raise TimeoutError("Timeout waiting for response")
+        return "1"
+
+
+def run_broadcast(command, **kwargs):
+    pool = ConnectionPool(timeout=1, adaptive_minimum=0.05)
+    client = FakeClient({"VOLT?": 0.2, "*TST?": 0.2, "*RST;*OPC?": 0.2})
+    return asyncio.run(pool.broadcast({"load": client}, command, **kwargs))["load"]
+
+
+def test_adaptive_timeout_cuts_slow_normal_query():
+    assert isinstance(run_broadcast("VOLT?"), TimeoutError)
+
+
+def test_slow_queries_bypass_adaptive_timeout():
+    assert run_broadcast("*TST?") == "1"
+    assert run_broadcast("*RST;*OPC?") == "1"
+
+
+def test_adaptive_opt_out_per_call():
+    assert run_broadcast("VOLT?", adaptive=False) == "1"
+    assert run_broadcast("VOLT?", minimum=0.5) == "1"
+
+
+def test_circuit_breaker_opens_after_threshold_and_closes_on_success():
+    breaker = CircuitBreaker(3)
+    assert not breaker.failure()
+    assert not breaker.failure()
+    assert breaker.failure()
+    assert breaker.open
+    assert not breaker.failure()
+    assert breaker.success()
+    assert not breaker.open
+    assert not breaker.success()
+    assert not breaker.failure()
+
+
+def test_probe_reopens_connection_dropped_after_timeout():
+    async def handle(reader, writer):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            # Bilinmeyen sorgu gibi: TST? hiç yanıtlanmaz
+            if line.strip() == b"*OPC?":
+                writer.write(b"1\n")
+                await writer.drain()
+        writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        pool = ConnectionPool(health_interval=0)
+        client = pool.add("probe", "127.0.0.1", port)
+        await pool.connect(("127.0.0.1", port))
+        try:
+            try:
+                await client.send_command("TST?", True, 0.1)
+            except TimeoutError:
+                pass
+            assert not client.connected
+            assert await pool.probe(client)
+            assert client.connected
+        finally:
+            await pool.close()
+            server.close()
+
+    asyncio.run(main())
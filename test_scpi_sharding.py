@@ -0,0 +1,45 @@
+from scpi_sharding import SharedRingBuffer
+
+
+def ring(capacity):
+    producer = SharedRingBuffer(capacity)
+    consumer = SharedRingBuffer(capacity, producer.name)
+    return producer, consumer
+
+
+def append(producer, start, stop):
+    for index in range(start, stop):
+        producer.append(float(index), index, 0, index * 0.5, 0.001)
+
+
+def test_drain_wraps_in_order():
+    producer, consumer = ring(4)
+    try:
+        append(producer, 0, 3)
+        assert [record[1] for record in consumer.drain()] == [0, 1, 2]
+        assert consumer.drain() == []
+        append(producer, 3, 6)
+        assert [record[1] for record in consumer.drain()] == [3, 4, 5]
+        assert consumer.dropped == 0
+    finally:
+        consumer.close()
+        producer.close()
+        producer.unlink()
+
+
+def test_drain_counts_overwritten_records():
+    producer, consumer = ring(4)
+    try:
+        append(producer, 0, 10)
+        # Halka doluyken üreticinin sıradaki yazacağı yuva (en eski kayıt) da atılır
+        records = consumer.drain()
+        assert [record[1] for record in records] == [7, 8, 9]
+        assert records[0] == (7.0, 7, 0, 3.5, 0.001)
+        assert consumer.dropped == 7
+        append(producer, 10, 11)
+        assert [record[1] for record in consumer.drain()] == [10]
+        assert consumer.stats()["written"] == 11
+    finally:
+        consumer.close()
+        producer.close()
+        producer.unlink()
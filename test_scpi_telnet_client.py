@@ -0,0 +1,36 @@
+from scpi_telnet_client import DO, DONT, IAC, SB, SE, SGA, TTYPE, WILL, WONT, TelnetFilter
+
+
+def test_plain_data_passes_through():
+    data, replies = TelnetFilter().feed(b"1.5\n")
+    assert data == b"1.5\n"
+    assert replies == b""
+
+
+def test_escaped_iac_and_commands_are_removed():
+    chunk = bytes((0x31, IAC, IAC, 0x32, IAC, 241, 0x33, IAC, SB, TTYPE, 1, IAC, IAC, IAC, SE, 0x0A))
+    data, replies = TelnetFilter().feed(chunk)
+    assert data == bytes((0x31, IAC, 0x32, 0x33, 0x0A))
+    assert replies == b""
+
+
+def test_negotiation_replies():
+    telnet = TelnetFilter()
+    data, replies = telnet.feed(bytes((IAC, DO, SGA, IAC, WILL, SGA, IAC, DO, TTYPE, IAC, WILL, TTYPE)))
+    assert data == b""
+    assert replies == bytes((IAC, WILL, SGA, IAC, DO, SGA, IAC, WONT, TTYPE, IAC, DONT, TTYPE))
+    # Durum değişmediyse yeniden onaylanmaz
+    assert telnet.feed(bytes((IAC, DO, SGA, IAC, WILL, SGA))) == (b"", b"")
+
+
+def test_sequences_split_across_chunks():
+    telnet = TelnetFilter()
+    chunk = bytes((0x41, IAC, DO, SGA, IAC, IAC, IAC, SB, TTYPE, 0x42, IAC, SE, 0x43))
+    data = bytearray()
+    replies = bytearray()
+    for index in range(len(chunk)):
+        part, reply = telnet.feed(chunk[index:index + 1])
+        data += part
+        replies += reply
+    assert bytes(data) == bytes((0x41, IAC, 0x43))
+    assert bytes(replies) == bytes((IAC, WILL, SGA))
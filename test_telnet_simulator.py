@@ -0,0 +1,29 @@
+import threading
+import time
+
+from scpi_telnet_client import SCPITelnetClient
+from telnet_simulator import SCPITelnetSimulator
+
+
+def test_non_ascii_line_does_not_kill_the_handler():
+    simulator = SCPITelnetSimulator(port=0)
+    threading.Thread(target=simulator.start, daemon=True).start()
+    port = 0
+    while not port:
+        time.sleep(0.01)
+        port = simulator.server.getsockname()[1] if simulator.server else 0
+    client = SCPITelnetClient("127.0.0.1", port)
+    # bind ile listen arasında bağlantı reddedilebilir
+    for _ in range(100):
+        try:
+            client.connect()
+            break
+        except ConnectionError:
+            time.sleep(0.01)
+    try:
+        client.connection.sendall("MEAS:VOLTé?\n".encode("utf-8"))
+        assert client.send_command("*IDN?", True, 1).startswith("Simulated Instrument")
+        assert client.send_command("MEAS:VOLT?", True, 1) == "3.3"
+    finally:
+        client.disconnect()
+        simulator.stop()